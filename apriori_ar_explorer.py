@@ -1,7 +1,119 @@
+import argparse
+import os
+import sys
+import time
+
 from data_processing.apriori_data_processor import AprioriDataProcessor
-from gui.gui_module import GUIModule
+from data_processing.rule_export import SUPPORTED_FORMATS, check_format_dependencies, rule_format
+
+def parse_arguments(argv = None):
+    parser = argparse.ArgumentParser(
+        description = "Apriori Association Rules Explorer. Starts the GUI unless a data file is given, " + \
+                      "in which case the rules are mined in batch mode and written to --output."
+    )
+    parser.add_argument("datafile", nargs = "?", help = "CSV or ARFF file to mine (omit to start the GUI)")
+    parser.add_argument("-o", "--output", help = "output file for the rules (.json, .jsonl, .csv or .parquet)")
+    parser.add_argument("--format", choices = sorted(SUPPORTED_FORMATS), help = "output format, by default taken from the output extension")
+    parser.add_argument("--min-sup", type = int, help = "absolute minimum support")
+    parser.add_argument("--min-conf", type = float, help = "minimum confidence between 0 and 1")
+    parser.add_argument("--fixed-length", action = "store_true", help = "CSV has one attribute per column instead of baskets")
+    parser.add_argument("--omit-first-column", action = "store_true", help = "skip the first CSV column (e.g. a row id)")
+    parser.add_argument("--engine", default = "apriori", choices = ["apriori", "fpgrowth", "eclat"])
+    parser.add_argument("--counting", default = "bitset", choices = ["bitset", "scan"], help = "Apriori support counting")
+    parser.add_argument("--representation", default = "auto", choices = ["auto", "tidset", "diffset"], help = "Eclat representation")
+    parser.add_argument("--itemsets", default = "all", choices = ["all", "closed", "maximal"], help = "build rules from all, closed or maximal frequent sets")
+    parser.add_argument("--top-k", type = int, help = "keep only the K best rules by --top-k-metric")
+    parser.add_argument("--top-k-metric", default = "lift", choices = ["conf", "lift", "cosine", "jaccard", "cf"], help = "metric ranking the rules in top-K mode")
+    parser.add_argument("--workers", type = int, default = 1, help = "processes for partitioned mining and rule generation")
+    parser.add_argument("--sampling", choices = ["exact", "approximate"], help = "mine a random sample, verified against all transactions (exact) or not (approximate)")
+    parser.add_argument("--sample-fraction", type = float, default = 0.1, help = "fraction of the transactions in the sample")
+    parser.add_argument("--sampling-delta", type = float, default = 0.01, help = "probability bound of the sampling error")
+    parser.add_argument("--sample-seed", type = int, help = "seed of the random sample")
+    parser.add_argument("--streaming", action = "store_true", help = "ingest the CSV in chunks without holding it in memory")
+    parser.add_argument("--chunk-size", type = int, default = 100000, help = "rows per chunk in streaming ingestion")
+    parser.add_argument("--no-store-cache", action = "store_true", help = "do not read or write the binary transaction store")
+    parser.add_argument("--no-deduplicate", action = "store_true", help = "keep identical transactions as separate rows when scanning them (FP-growth, Apriori --counting scan)")
+    parser.add_argument("--stats-json", help = "write phase times, per-level counts, cache statistics and memory use to this JSON file")
+    parser.add_argument("--profile", help = "profile the run with cProfile and write the profile to this file")
+    parser.add_argument("--trace-memory", action = "store_true", help = "trace Python allocations with tracemalloc (slow)")
+    return parser.parse_args(argv)
+
+def run_batch(args) -> int:
+    if args.output == None or args.min_sup == None or args.min_conf == None:
+        print(f"[ERROR] Batch mode requires --output, --min-sup and --min-conf.")
+        return 2
+    if not os.path.isfile(args.datafile):
+        print(f"[ERROR] Data file '{args.datafile}' does not exist.")
+        return 2
+    output_format = rule_format(args.output) if args.format == None else args.format
+    if output_format not in SUPPORTED_FORMATS:
+        print(f"[ERROR] Output format '{output_format}' is not supported!")
+        return 2
+    try:
+        check_format_dependencies(output_format)
+    except ImportError as e:
+        print(f"[ERROR] Could not write rules to '{args.output}': {e}")
+        return 1
+
+    start_time = time.perf_counter()
+    adp = AprioriDataProcessor()
+    adp.set_parameters({
+        "min_sup": args.min_sup,
+        "min_conf": args.min_conf,
+        "engine": args.engine,
+        "counting": args.counting,
+        "representation": args.representation,
+        "workers": args.workers,
+        "itemsets": args.itemsets,
+        "top_k": args.top_k,
+        "top_k_metric": args.top_k_metric,
+        "sampling": args.sampling,
+        "sample_fraction": args.sample_fraction,
+        "sampling_delta": args.sampling_delta,
+        "sample_seed": args.sample_seed,
+        "streaming": args.streaming,
+        "chunk_size": args.chunk_size,
+        "store_cache": not args.no_store_cache,
+        "deduplicate": not args.no_deduplicate,
+        "profile": args.profile,
+        "trace_memory": args.trace_memory,
+        "incremental": False,
+        "columnar": True
+    })
+    result = adp.process_data(args.datafile, args.fixed_length, args.omit_first_column)
+    if result == None:
+        return 1
+    rules, n_transactions = result
+
+    print(f"[INFO] Writing {len(rules)} rules to '{args.output}'.")
+    try:
+        adp.export_rules(args.output, output_format)
+    except (OSError, ImportError) as e:
+        print(f"[ERROR] Could not write rules to '{args.output}': {e}")
+        return 1
+
+    timings = adp.timings()
+    timings["total"] = time.perf_counter() - start_time
+    print(f"[INFO] Transactions: {n_transactions}, strong rules: {len(rules)}.")
+    print(f"[INFO] Timings: " + ", ".join(f"{stage} {seconds:.3f} s" for stage, seconds in timings.items()) + ".")
+
+    # Written after the export so its time is included
+    if args.stats_json != None:
+        try:
+            adp.stats().to_json(args.stats_json)
+        except OSError as e:
+            print(f"[ERROR] Could not write run statistics to '{args.stats_json}': {e}")
+            return 1
+        print(f"[INFO] Run statistics written to '{args.stats_json}'.")
+    return 0
 
 def main():
+    args = parse_arguments()
+    if args.datafile != None:
+        sys.exit(run_batch(args))
+
+    # The GUI pulls in tkinter, so it is only imported when no batch job was requested
+    from gui.gui_module import GUIModule
     print("Starting Apriori Association Rules Explorer")
     gm = GUIModule()
     gm.run()
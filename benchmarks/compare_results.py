@@ -0,0 +1,41 @@
+import argparse
+import json
+import statistics
+
+def load_results(path: str) -> list:
+    with open(path, "r") as file:
+        return [json.loads(line) for line in file if line.strip() != ""]
+
+def main():
+    parser = argparse.ArgumentParser(description = "Compare benchmark results of two revisions (or labels) case by case.")
+    parser.add_argument("results", help = "JSON Lines file written by run_benchmarks")
+    parser.add_argument("baseline", help = "revision or label of the baseline runs")
+    parser.add_argument("candidate", help = "revision or label of the runs compared to the baseline")
+    parser.add_argument("--metric", default = "wall_time", help = "wall_time, cpu_time, peak_rss_kb, candidates or a phase of timings")
+    args = parser.parse_args()
+
+    # Median over the repetitions of every (dataset, engine, min_sup, min_conf) case
+    values = {}
+    for record in load_results(args.results):
+        run = args.baseline if args.baseline in (record.get("revision"), record.get("label")) else \
+              args.candidate if args.candidate in (record.get("revision"), record.get("label")) else None
+        if run == None or not record.get("ok", False):
+            continue
+        value = record.get(args.metric, record["timings"].get(args.metric))
+        if value == None:
+            continue
+        case = (record["dataset"], record["engine"], record["min_sup"], record["min_conf"])
+        values.setdefault(case, {}).setdefault(run, []).append(value)
+
+    print(f"{'dataset':<12} {'engine':<9} {'min_sup':>8} {'min_conf':>8} {args.baseline:>12} {args.candidate:>12} {'ratio':>7}")
+    for case in sorted(values):
+        runs = values[case]
+        if args.baseline not in runs or args.candidate not in runs:
+            continue
+        baseline = statistics.median(runs[args.baseline])
+        candidate = statistics.median(runs[args.candidate])
+        ratio = candidate / baseline if baseline != 0 else float("nan")
+        print(f"{case[0]:<12} {case[1]:<9} {case[2]:>8} {case[3]:>8} {baseline:>12.4g} {candidate:>12.4g} {ratio:>7.2f}")
+
+if __name__ == "__main__":
+    main()
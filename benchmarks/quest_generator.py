@@ -0,0 +1,98 @@
+import argparse
+import numpy as np
+
+class QuestGenerator:
+    def __init__(self, n_transactions: int = 10000, avg_length: float = 10, n_items: int = 1000, avg_pattern_length: float = 4,
+                 n_patterns: int = 2000, correlation: float = 0.5, corruption: float = 0.5, seed: int = 0):
+        # Synthetic market baskets after the IBM Quest generator (Agrawal & Srikant, 1994), named
+        # T<avg_length>I<avg_pattern_length>D<n_transactions>. Transactions are assembled from
+        # n_patterns "potentially large" itemsets; every pattern reuses on average a correlation
+        # fraction of the items of the previous one, and is corrupted (items dropped) when used.
+        self.n_transactions = n_transactions
+        self.avg_length = avg_length
+        self.n_items = n_items
+        self.avg_pattern_length = avg_pattern_length
+        self.n_patterns = n_patterns
+        self.correlation = correlation
+        self.corruption = corruption
+        self.seed = seed
+
+    def name(self) -> str:
+        return f"T{self.avg_length:g}I{self.avg_pattern_length:g}D{self.n_transactions}N{self.n_items}C{self.correlation:g}S{self.seed}"
+
+    def transactions(self):
+        # Yields every transaction as a sorted list of item ids; equal parameters and seed
+        # always give the same transactions
+        rng = np.random.default_rng(self.seed)
+        patterns = self.__patterns(rng)
+        weights = rng.exponential(1.0, len(patterns))
+        weights /= weights.sum()
+        corruption_levels = np.clip(rng.normal(self.corruption, 0.1, len(patterns)), 0.0, 1.0)
+
+        # Patterns are drawn in blocks to keep the number of generator calls low
+        block = rng.choice(len(patterns), size = 4096, p = weights)
+        position = 0
+        deferred = None
+        for _ in range(self.n_transactions):
+            size = max(1, rng.poisson(self.avg_length))
+            transaction = set()
+            while len(transaction) < size:
+                if deferred != None:
+                    pattern, deferred = deferred, None
+                else:
+                    if position == len(block):
+                        block = rng.choice(len(patterns), size = 4096, p = weights)
+                        position = 0
+                    p = block[position]
+                    position += 1
+                    # Drop items from the pattern as long as a uniform draw stays below its corruption level
+                    pattern = patterns[p]
+                    n_kept = len(pattern)
+                    while n_kept > 0 and rng.random() < corruption_levels[p]:
+                        n_kept -= 1
+                    pattern = rng.permutation(pattern)[:n_kept].tolist()
+
+                if len(transaction) + len(pattern) > size and len(transaction) > 0 and rng.random() < 0.5:
+                    # Does not fit: keep it for the next transaction half of the time
+                    deferred = pattern
+                    break
+                transaction.update(pattern)
+            yield sorted(transaction)
+
+    def write_csv(self, path: str):
+        # Basket layout read by the non fixed-length CSV loader: one transaction per line
+        with open(path, "w") as file:
+            for transaction in self.transactions():
+                file.write(",".join(f"i{item}" for item in transaction) + "\n")
+
+    def __patterns(self, rng) -> list:
+        patterns = []
+        previous = np.zeros(0, dtype = np.int64)
+        for _ in range(self.n_patterns):
+            size = min(self.n_items, max(1, rng.poisson(self.avg_pattern_length)))
+            n_reused = min(len(previous), size, int(round(rng.exponential(self.correlation) * size)))
+            reused = rng.choice(previous, size = n_reused, replace = False) if n_reused > 0 else np.zeros(0, dtype = np.int64)
+            fresh = rng.choice(np.setdiff1d(np.arange(self.n_items), reused), size = size - n_reused, replace = False)
+            previous = np.concatenate((reused, fresh))
+            patterns.append(previous)
+        return patterns
+
+def main():
+    parser = argparse.ArgumentParser(description = "Generate IBM Quest-style synthetic transactions as a basket CSV file.")
+    parser.add_argument("output", help = "CSV file to write")
+    parser.add_argument("-D", "--transactions", type = int, default = 10000, help = "number of transactions")
+    parser.add_argument("-T", "--avg-length", type = float, default = 10, help = "average transaction length")
+    parser.add_argument("-N", "--items", type = int, default = 1000, help = "number of distinct items")
+    parser.add_argument("-I", "--avg-pattern-length", type = float, default = 4, help = "average length of the potentially large itemsets")
+    parser.add_argument("-L", "--patterns", type = int, default = 2000, help = "number of potentially large itemsets")
+    parser.add_argument("-C", "--correlation", type = float, default = 0.5, help = "mean fraction of items a pattern shares with the previous one")
+    parser.add_argument("--corruption", type = float, default = 0.5, help = "mean corruption level of the patterns")
+    parser.add_argument("--seed", type = int, default = 0)
+    args = parser.parse_args()
+
+    generator = QuestGenerator(args.transactions, args.avg_length, args.items, args.avg_pattern_length, args.patterns, args.correlation, args.corruption, args.seed)
+    generator.write_csv(args.output)
+    print(f"[INFO] {generator.name()} written to '{args.output}'.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
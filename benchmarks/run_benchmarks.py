@@ -0,0 +1,146 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import subprocess
+import time
+from scipy.io import arff
+
+from benchmarks.quest_generator import QuestGenerator
+from data_processing.run_stats import peak_rss_kb
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GENERATED_DIR = os.path.join(REPO_DIR, "benchmarks", "generated")
+
+# Bundled datasets and generated ones; min_sup values are fractions of the transactions
+DATASETS = {
+    "groceries": {"path": "data/groceries_data/groceries.csv", "fixed_length": False, "ommit_first_column": False, "min_sup": [0.01, 0.005, 0.002]},
+    "zoo": {"path": "data/zoo_data/zoo_data.arff", "fixed_length": False, "ommit_first_column": False, "min_sup": [0.5, 0.4, 0.35]},
+    "shopping": {"path": "data/shopping_trend_data/shopping_trends.csv", "fixed_length": True, "ommit_first_column": True, "min_sup": [0.05, 0.03, 0.02]},
+    "T10I4D10K": {"generator": {"n_transactions": 10000, "avg_length": 10, "n_items": 1000, "avg_pattern_length": 4, "correlation": 0.5}, "min_sup": [0.01, 0.005, 0.0025]},
+    "T20I6D10K": {"generator": {"n_transactions": 10000, "avg_length": 20, "n_items": 1000, "avg_pattern_length": 6, "correlation": 0.5}, "min_sup": [0.02, 0.01, 0.005]},
+    "T10I4D100K": {"generator": {"n_transactions": 100000, "avg_length": 10, "n_items": 1000, "avg_pattern_length": 4, "correlation": 0.5}, "min_sup": [0.01, 0.005]}
+}
+DEFAULT_DATASETS = ["groceries", "zoo", "shopping", "T10I4D10K", "T20I6D10K"]
+
+def dataset_file(name: str, seed: int) -> str:
+    spec = DATASETS[name]
+    if "path" in spec:
+        return os.path.join(REPO_DIR, spec["path"])
+
+    # Generated files are named after all parameters and reused by later runs
+    generator = QuestGenerator(seed = seed, **spec["generator"])
+    path = os.path.join(GENERATED_DIR, f"{generator.name()}.csv")
+    if not os.path.exists(path):
+        os.makedirs(GENERATED_DIR, exist_ok = True)
+        print(f"[INFO] Generating {generator.name()}.")
+        generator.write_csv(path)
+    return path
+
+def count_transactions(path: str, fixed_length: bool) -> int:
+    # Needed up front to turn min_sup fractions into absolute supports, counted like the loaders do
+    if path.endswith(".arff"):
+        data, meta = arff.loadarff(path)
+        return len(data)
+    with open(path, "r") as file:
+        n_lines = sum(1 for line in file)
+    return n_lines - 1 if fixed_length else n_lines
+
+def run_case(case: dict) -> dict:
+    # Runs in a fresh process, so the peak RSS belongs to this case alone
+    from data_processing.apriori_data_processor import AprioriDataProcessor
+    from data_processing.mining_progress import MiningProgress
+
+    events = []
+    adp = AprioriDataProcessor()
+    adp.set_parameters(dict(case["parameters"], incremental = False, columnar = True))
+    cpu_start_time = time.process_time()
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = adp.process_data(case["path"], case["fixed_length"], case["ommit_first_column"], progress = MiningProgress(events.append))
+    wall_time = time.perf_counter() - start_time
+    cpu_time = time.process_time() - cpu_start_time
+
+    record = dict(case["record"])
+    record["ok"] = result != None
+    record["wall_time"] = wall_time
+    record["cpu_time"] = cpu_time
+    record["timings"] = adp.timings()
+    record["peak_rss_kb"] = peak_rss_kb()
+    record["stats"] = adp.stats().to_dict()
+
+    # Per-level counts published by the level-wise engines
+    levels = [event for event in events if event["stage"] == "frequent sets" and "level" in event]
+    record["levels"] = [{"level": event["level"], "counted": event["counted"], "frequent": event["frequent"]} for event in levels]
+    record["candidates"] = sum(event["counted"] for event in levels) if len(levels) > 0 else None
+    if result != None:
+        rules, n_transactions = result
+        record["n_transactions"] = n_transactions
+        record["rules"] = len(rules)
+    return record
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd = REPO_DIR, capture_output = True, text = True, check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description = "Benchmark the mining engines over a grid of datasets, min_sup and min_conf values.")
+    parser.add_argument("-o", "--output", default = os.path.join(REPO_DIR, "benchmarks", "results.jsonl"), help = "JSON Lines file the results are appended to")
+    parser.add_argument("--datasets", nargs = "+", default = DEFAULT_DATASETS, choices = list(DATASETS))
+    parser.add_argument("--engines", nargs = "+", default = ["apriori"], choices = ["apriori", "fpgrowth", "eclat"])
+    parser.add_argument("--min-sup", nargs = "+", type = float, help = "min_sup values as fractions of the transactions (default: per dataset)")
+    parser.add_argument("--min-conf", nargs = "+", type = float, default = [0.5, 0.8])
+    parser.add_argument("--repeat", type = int, default = 1, help = "runs of every configuration")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the generated datasets")
+    parser.add_argument("--label", default = "", help = "free text stored with every result, e.g. the change being measured")
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    revision = git_revision()
+    started = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    cases = []
+    for name in args.datasets:
+        spec = DATASETS[name]
+        path = dataset_file(name, args.seed)
+        n_transactions = count_transactions(path, spec.get("fixed_length", False))
+        for min_sup_fraction in (spec["min_sup"] if args.min_sup == None else args.min_sup):
+            min_sup = max(1, math.ceil(min_sup_fraction * n_transactions))
+            for min_conf in args.min_conf:
+                for engine in args.engines:
+                    for repetition in range(args.repeat):
+                        cases.append({
+                            "path": path,
+                            "fixed_length": spec.get("fixed_length", False),
+                            "ommit_first_column": spec.get("ommit_first_column", False),
+                            "parameters": {"min_sup": min_sup, "min_conf": min_conf, "engine": engine, "store_cache": False},
+                            "record": {
+                                "started": started, "revision": revision, "label": args.label, "dataset": name,
+                                "engine": engine, "min_sup_fraction": min_sup_fraction, "min_sup": min_sup,
+                                "min_conf": min_conf, "repetition": repetition
+                            }
+                        })
+
+    print(f"[INFO] Running {len(cases)} benchmark cases, results are appended to '{args.output}'.")
+    context = multiprocessing.get_context("spawn")
+    with open(args.output, "a") as file:
+        for case in cases:
+            with ProcessPoolExecutor(max_workers = 1, mp_context = context) as executor:
+                record = executor.submit(run_case, case).result()
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            timings = record["timings"]
+            print(f"    |---- {record['dataset']} {record['engine']} min_sup {record['min_sup']} min_conf {record['min_conf']}: " + \
+                  f"load {timings.get('load', 0):.3f} s, frequent sets {timings.get('frequent_sets', 0):.3f} s, " + \
+                  f"rules {timings.get('rules', 0):.3f} s, metrics {timings.get('metrics', 0):.3f} s, " + \
+                  f"peak RSS {record['peak_rss_kb']} kB, {record['candidates']} candidates, {record.get('rules')} rules.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
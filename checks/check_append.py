@@ -0,0 +1,107 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+from data_processing.apriori_data_processor import AprioriDataProcessor
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GROCERIES = os.path.join(REPO_DIR, "data", "groceries_data", "groceries.csv")
+
+def read_baskets(path: str) -> list:
+    # Lines of a basket CSV, tokenized as the basket loader does
+    with open(path, "r") as file:
+        lines = [line.rstrip("\n") for line in file]
+    return [line for line in lines if line != ""]
+
+def tokens(line: str) -> list:
+    return [item.strip() for item in line.split(",")]
+
+def write_baskets(path: str, lines: list):
+    with open(path, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+def rule_dict(result) -> dict:
+    rules, n_transactions = result
+    return {(frozenset(rule["rule"][0]), frozenset(rule["rule"][1])): (rule["sup"], rule["conf"]) for rule in rules}
+
+def new_processor(parameters: dict) -> AprioriDataProcessor:
+    adp = AprioriDataProcessor()
+    adp.set_parameters(dict(parameters, store_cache = False))
+    return adp
+
+def splits(lines: list, min_sup: int) -> dict:
+    # "tail": the last 30% of the transactions are appended in two batches.
+    # "new items": every transaction holding one of the three least frequent items that are
+    # frequent overall is appended, so those items are unknown to the first run.
+    n_base = len(lines) * 7 // 10
+    n_middle = (len(lines) + n_base) // 2
+    item_counts = {}
+    for line in lines:
+        for item in set(tokens(line)):
+            item_counts[item] = item_counts.get(item, 0) + 1
+    new_items = set(sorted((item for item, count in item_counts.items() if count >= min_sup), key = lambda item: (item_counts[item], item))[:3])
+    held_back = [line for line in lines if len(new_items.intersection(tokens(line))) > 0]
+    return {
+        "tail": (lines[:n_base], [lines[n_base:n_middle], lines[n_middle:]]),
+        "new items": ([line for line in lines if len(new_items.intersection(tokens(line))) == 0], [held_back])
+    }
+
+def check_case(directory: str, base: list, batches: list, parameters: dict):
+    # Rules after appending the batches to the base, and rules of a fresh run on all the transactions
+    base_path = os.path.join(directory, "base.csv")
+    full_path = os.path.join(directory, "full.csv")
+    write_baskets(base_path, base)
+    write_baskets(full_path, base + [line for batch in batches for line in batch])
+
+    adp = new_processor(parameters)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = adp.process_data(base_path, fixed_length = False, ommit_first_column = False)
+        for batch in batches:
+            if result == None:
+                break
+            result = adp.append_transactions([tokens(line) for line in batch])
+    appended = None if result == None else rule_dict(result)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = new_processor(parameters).process_data(full_path, fixed_length = False, ommit_first_column = False)
+    full = None if result == None else rule_dict(result)
+    return appended, full
+
+def main():
+    parser = argparse.ArgumentParser(description = "Check that appending transactions gives exactly the rules of re-mining all of them.")
+    parser.add_argument("datafile", nargs = "?", default = GROCERIES, help = "basket CSV file, groceries by default")
+    parser.add_argument("--engines", nargs = "+", default = ["apriori", "fpgrowth", "eclat"])
+    parser.add_argument("--min-sup", type = int, default = 100)
+    parser.add_argument("--min-conf", type = float, default = 0.3)
+    parser.add_argument("--small-cache-bytes", type = int, default = 4096, help = "support cache size of the small-cache runs")
+    args = parser.parse_args()
+
+    lines = read_baskets(args.datafile)
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        for split, (base, batches) in splits(lines, args.min_sup).items():
+            for engine in args.engines:
+                for cache_max_bytes in [None, args.small_cache_bytes]:
+                    parameters = {"min_sup": args.min_sup, "min_conf": args.min_conf, "engine": engine}
+                    case = f"{split}, {engine}"
+                    if cache_max_bytes != None:
+                        parameters["cache_max_bytes"] = cache_max_bytes
+                        case += f", cache of {cache_max_bytes} bytes"
+
+                    appended, full = check_case(directory, base, batches, parameters)
+                    if appended == None or full == None:
+                        print(f"[ERROR] {case}: mining failed.")
+                        failed = True
+                    elif appended != full:
+                        print(f"[ERROR] {case}: appending found {len(appended)} rules, re-mining {len(full)}; " + \
+                              f"{len(appended.items() ^ full.items())} rules differ.")
+                        failed = True
+                    else:
+                        print(f"[INFO] {case}: appending and re-mining found the same {len(full)} rules.")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
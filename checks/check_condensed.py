@@ -0,0 +1,99 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+from data_processing.apriori_algorithm import Apriori
+from data_processing.apriori_data_processor import AprioriDataProcessor
+from data_processing.closed_itemsets import ClosedSupports, closed_itemsets, maximal_itemsets
+from data_processing.eclat_algorithm import Eclat
+from data_processing.transaction_database import TransactionDatabase
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GROCERIES = os.path.join(REPO_DIR, "data", "groceries_data", "groceries.csv")
+
+def read_transactions(path: str) -> TransactionDatabase:
+    # Basket CSV tokenized as the basket loader does
+    with open(path, "r") as file:
+        return TransactionDatabase.from_token_rows([item.strip() for item in line.split(",")] for line in file)
+
+def mine_rules(path: str, parameters: dict) -> dict:
+    adp = AprioriDataProcessor()
+    adp.set_parameters(dict(parameters, store_cache = False))
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = adp.process_data(path, fixed_length = False, ommit_first_column = False)
+    if result == None:
+        return None
+    rules, n_transactions = result
+    return {(frozenset(rule["rule"][0]), frozenset(rule["rule"][1])): {column: rule[column] for column in rule if column != "rule"} for rule in rules}
+
+def brute_force_maximal(supports: dict) -> dict:
+    # Frequent sets none of whose one-item extensions is frequent; by downward closure no
+    # larger superset is frequent either
+    extended = set()
+    for itemset in supports:
+        for d in range(len(itemset)):
+            extended.add(itemset[:d] + itemset[d + 1:])
+    return {itemset: sup for itemset, sup in supports.items() if itemset not in extended}
+
+def check_rules(path: str, engine: str, min_sup: int, min_conf: float) -> list:
+    # Every closed or maximal mode rule has to be in the full rule set with identical metrics
+    errors = []
+    parameters = {"min_sup": min_sup, "min_conf": min_conf, "engine": engine}
+    full = mine_rules(path, parameters)
+    for itemsets in ["closed", "maximal"]:
+        condensed = mine_rules(path, dict(parameters, itemsets = itemsets))
+        if full == None or condensed == None:
+            errors.append(f"{engine}, {itemsets}: mining failed.")
+            continue
+        missing = [rule for rule in condensed if rule not in full]
+        different = [rule for rule in condensed if rule in full and condensed[rule] != full[rule]]
+        if len(missing) > 0 or len(different) > 0:
+            errors.append(f"{engine}, {itemsets}: of {len(condensed)} rules {len(missing)} are not in the full rule set " + \
+                          f"and {len(different)} have different metrics.")
+        else:
+            print(f"[INFO] {engine}, {itemsets}: all {len(condensed)} rules are in the full rule set ({len(full)}) with identical metrics.")
+    return errors
+
+def check_itemsets(database: TransactionDatabase, min_sup: int) -> list:
+    # Closed sets of CHARM and of the reduction of all frequent sets, the supports ClosedSupports
+    # recovers from them, and maximal sets against their definition
+    errors = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        supports = dict(Apriori(min_sup = min_sup).mine_frequent_sets(database))
+        charm_closed = dict(Eclat(min_sup = min_sup, itemsets = "closed").mine_frequent_sets(database))
+    maximal = brute_force_maximal(supports)
+
+    for source, closed in [("closed_itemsets", closed_itemsets(supports)), ("CHARM", charm_closed)]:
+        recovered = ClosedSupports(closed)
+        wrong_supports = [itemset for itemset, sup in supports.items() if recovered.get(itemset) != sup]
+        if len(wrong_supports) > 0:
+            errors.append(f"{source}: supports of {len(wrong_supports)} of {len(supports)} frequent sets are not recovered exactly.")
+        found = maximal_itemsets(closed)
+        if found != maximal:
+            errors.append(f"{source}: {len(found)} maximal sets found, {len(maximal)} frequent sets have no frequent superset; " + \
+                          f"{len(found.items() ^ maximal.items())} differ.")
+        if len(wrong_supports) == 0 and found == maximal:
+            print(f"[INFO] {source}: {len(closed)} closed sets recover all {len(supports)} supports, the {len(maximal)} maximal sets are exact.")
+    if closed_itemsets(supports) != charm_closed:
+        errors.append(f"CHARM found {len(charm_closed)} closed sets, the reduction of all frequent sets {len(closed_itemsets(supports))}.")
+    return errors
+
+def main():
+    parser = argparse.ArgumentParser(description = "Check closed and maximal frequent set mining against all frequent sets and rules.")
+    parser.add_argument("datafile", nargs = "?", default = GROCERIES, help = "basket CSV file, groceries by default")
+    parser.add_argument("--engines", nargs = "+", default = ["apriori", "fpgrowth", "eclat"])
+    parser.add_argument("--min-sup", type = int, default = 50)
+    parser.add_argument("--min-conf", type = float, default = 0.2)
+    args = parser.parse_args()
+
+    errors = check_itemsets(read_transactions(args.datafile), args.min_sup)
+    for engine in args.engines:
+        errors += check_rules(args.datafile, engine, args.min_sup, args.min_conf)
+    for error in errors:
+        print(f"[ERROR] {error}")
+    return 1 if len(errors) > 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+from data_processing.apriori_data_processor import AprioriDataProcessor
+
+def write_missing_values_csv(path: str, n_rows: int = 1000, seed: int = 0):
+    # Fixed-length CSV whose numeric column "a" only has blanks in its second half, so pandas
+    # reads it as int in the first chunks and as float in the later ones
+    rng = np.random.default_rng(seed)
+    a = pd.array(rng.integers(0, 3, n_rows), dtype = "Int64")
+    a[n_rows // 2:][rng.random(n_rows - n_rows // 2) < 0.2] = pd.NA
+    df = pd.DataFrame({"a": a, "b": rng.integers(0, 3, n_rows), "c": rng.choice(["x", "y"], n_rows)})
+    df.to_csv(path, index = False)
+
+def mine_rules(path: str, streaming: bool, min_sup: int, min_conf: float, chunk_size: int, ommit_first_column: bool) -> dict:
+    adp = AprioriDataProcessor()
+    adp.set_parameters({"min_sup": min_sup, "min_conf": min_conf, "streaming": streaming, "chunk_size": chunk_size, "store_cache": False})
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = adp.process_data(path, fixed_length = True, ommit_first_column = ommit_first_column)
+    if result == None:
+        return None
+    rules, n_transactions = result
+    return {(frozenset(rule["rule"][0]), frozenset(rule["rule"][1])): (rule["sup"], rule["conf"]) for rule in rules}
+
+def check(path: str, min_sup: int, min_conf: float, chunk_size: int, ommit_first_column: bool) -> int:
+    in_memory = mine_rules(path, False, min_sup, min_conf, chunk_size, ommit_first_column)
+    streamed = mine_rules(path, True, min_sup, min_conf, chunk_size, ommit_first_column)
+    if in_memory == None or streamed == None:
+        print(f"[ERROR] Mining '{path}' failed.")
+        return 1
+    if in_memory != streamed:
+        print(f"[ERROR] In-memory loading found {len(in_memory)} rules, streaming {len(streamed)}; " + \
+              f"{len(in_memory.items() ^ streamed.items())} rules differ.")
+        return 1
+    print(f"[INFO] In-memory loading and streaming found the same {len(in_memory)} rules.")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description = "Check that streaming ingestion and the in-memory loader give the same rules for a fixed-length CSV.")
+    parser.add_argument("datafile", nargs = "?", help = "fixed-length CSV file; by default one with missing numeric values is generated")
+    parser.add_argument("--min-sup", type = int, default = 100)
+    parser.add_argument("--min-conf", type = float, default = 0.3)
+    parser.add_argument("--chunk-size", type = int, default = 500)
+    parser.add_argument("--ommit-first-column", action = "store_true")
+    args = parser.parse_args()
+
+    if args.datafile != None:
+        return check(args.datafile, args.min_sup, args.min_conf, args.chunk_size, args.ommit_first_column)
+
+    # The generated file and the store streaming writes next to it are removed afterwards
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "missing_values.csv")
+        write_missing_values_csv(path)
+        return check(path, args.min_sup, args.min_conf, args.chunk_size, args.ommit_first_column)
+
+if __name__ == "__main__":
+    sys.exit(main())
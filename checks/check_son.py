@@ -0,0 +1,48 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+from data_processing.apriori_data_processor import AprioriDataProcessor
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GROCERIES = os.path.join(REPO_DIR, "data", "groceries_data", "groceries.csv")
+
+def mine_rules(path: str, engine: str, workers: int, min_sup: int, min_conf: float, fixed_length: bool) -> dict:
+    adp = AprioriDataProcessor()
+    adp.set_parameters({"min_sup": min_sup, "min_conf": min_conf, "engine": engine, "workers": workers})
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = adp.process_data(path, fixed_length = fixed_length, ommit_first_column = False)
+    if result == None:
+        return None
+    rules, n_transactions = result
+    return {(frozenset(rule["rule"][0]), frozenset(rule["rule"][1])): (rule["sup"], rule["conf"]) for rule in rules}
+
+def main():
+    parser = argparse.ArgumentParser(description = "Check that SON partitioned mining gives exactly the rules of the serial engines.")
+    parser.add_argument("datafile", nargs = "?", default = GROCERIES, help = "data file, groceries by default")
+    parser.add_argument("--fixed-length", action = "store_true", help = "the data file is a fixed-length CSV")
+    parser.add_argument("--engines", nargs = "+", default = ["apriori", "fpgrowth", "eclat"])
+    parser.add_argument("--workers", type = int, default = 32)
+    parser.add_argument("--min-sup", type = int, default = 100)
+    parser.add_argument("--min-conf", type = float, default = 0.3)
+    args = parser.parse_args()
+
+    failed = False
+    for engine in args.engines:
+        serial = mine_rules(args.datafile, engine, 1, args.min_sup, args.min_conf, args.fixed_length)
+        partitioned = mine_rules(args.datafile, engine, args.workers, args.min_sup, args.min_conf, args.fixed_length)
+        if serial == None or partitioned == None:
+            print(f"[ERROR] Mining '{args.datafile}' with {engine} failed.")
+            failed = True
+        elif serial != partitioned:
+            print(f"[ERROR] {engine}: the serial engine found {len(serial)} rules, SON with {args.workers} workers {len(partitioned)}; " + \
+                  f"{len(serial.items() ^ partitioned.items())} rules differ.")
+            failed = True
+        else:
+            print(f"[INFO] {engine}: the serial engine and SON with {args.workers} workers found the same {len(serial)} rules.")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
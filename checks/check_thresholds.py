@@ -0,0 +1,62 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+from data_processing.apriori_data_processor import AprioriDataProcessor
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GROCERIES = os.path.join(REPO_DIR, "data", "groceries_data", "groceries.csv")
+
+# Thresholds applied one after the other: raising both, only one of them, then lowering
+# min_sup below the first run and min_conf below every earlier run, then raising again
+THRESHOLDS = [(100, 0.4), (150, 0.5), (150, 0.6), (200, 0.4), (80, 0.3), (60, 0.3), (60, 0.2), (120, 0.5)]
+
+def mine_rules(adp: AprioriDataProcessor, path: str, parameters: dict) -> tuple:
+    adp.set_parameters(dict(parameters, store_cache = False))
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = adp.process_data(path, fixed_length = False, ommit_first_column = False)
+    if result == None:
+        return None, output.getvalue()
+    rules, n_transactions = result
+    rules = {(frozenset(rule["rule"][0]), frozenset(rule["rule"][1])): {column: rule[column] for column in rule if column != "rule"} for rule in rules}
+    return rules, output.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description = "Check that re-mining with raised and lowered thresholds gives the rules of a fresh run.")
+    parser.add_argument("datafile", nargs = "?", default = GROCERIES, help = "basket CSV file, groceries by default")
+    parser.add_argument("--engines", nargs = "+", default = ["apriori", "fpgrowth", "eclat"])
+    args = parser.parse_args()
+
+    failed = False
+    for engine in args.engines:
+        adp = AprioriDataProcessor()
+        for min_sup, min_conf in THRESHOLDS:
+            parameters = {"min_sup": min_sup, "min_conf": min_conf, "engine": engine}
+            reused, output = mine_rules(adp, args.datafile, parameters)
+            fresh, _ = mine_rules(AprioriDataProcessor(), args.datafile, parameters)
+            # Which of the earlier results the run started from
+            if "Filtering strong rules" in output:
+                source = "filtered rules"
+            elif "Filtering frequent sets" in output:
+                source = "filtered frequent sets"
+            elif "Reusing transactions" in output:
+                source = "extended frequent sets"
+            else:
+                source = "a first run"
+            if reused == None or fresh == None:
+                print(f"[ERROR] {engine}, min_sup {min_sup}, min_conf {min_conf}: mining failed.")
+                failed = True
+            elif reused != fresh:
+                print(f"[ERROR] {engine}, min_sup {min_sup}, min_conf {min_conf}: {len(reused)} rules from {source}, " + \
+                      f"{len(fresh)} from a fresh run; {len(reused.keys() ^ fresh.keys())} rules differ, " + \
+                      f"{len([rule for rule in reused.keys() & fresh.keys() if reused[rule] != fresh[rule]])} have different metrics.")
+                failed = True
+            else:
+                print(f"[INFO] {engine}, min_sup {min_sup}, min_conf {min_conf}: the {len(fresh)} rules from {source} equal a fresh run.")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+from data_processing.apriori_data_processor import AprioriDataProcessor
+from data_processing.association_rules import TOP_K_METRICS, rule_metric
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GROCERIES = os.path.join(REPO_DIR, "data", "groceries_data", "groceries.csv")
+
+def mine_rules(path: str, parameters: dict, fixed_length: bool):
+    adp = AprioriDataProcessor()
+    adp.set_parameters(dict(parameters, columnar = True, store_cache = False))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return adp.process_data(path, fixed_length = fixed_length, ommit_first_column = False)
+
+def rule_rows(rules, n_transactions: int) -> list:
+    # One row per rule: (antecedent ids, consequent ids, sup(X u Y), sup(X), sup(Y), metrics).
+    # The integer supports of X and Y are recovered from conf and lift.
+    rows = []
+    metrics = {column: values.tolist() for column, values in rules.metrics.items()}
+    for i in range(len(rules)):
+        antecedent = tuple(rules.antecedents[1][rules.antecedents[0][i]:rules.antecedents[0][i + 1]].tolist())
+        consequent = tuple(rules.consequents[1][rules.consequents[0][i]:rules.consequents[0][i + 1]].tolist())
+        sup_xy = metrics["sup"][i]
+        sup_x = round(sup_xy / metrics["conf"][i])
+        sup_y = round(n_transactions * metrics["conf"][i] / metrics["lift"][i])
+        rows.append((antecedent, consequent, sup_xy, sup_x, sup_y, {column: values[i] for column, values in metrics.items()}))
+    return rows
+
+def expected_top_rules(rows: list, metric: str, top_k: int, n_transactions: int) -> list:
+    # Brute force: the K largest rules by (metric value, rule), the rule compared by its antecedent
+    # ids, consequent ids and supports, then ranked as the processor ranks top-K results:
+    # descending metric, support and confidence, ties kept in that order
+    def value(row):
+        return rule_metric(metric, row[2], row[3], row[4], n_transactions)
+    top = sorted(rows, key = lambda row: (value(row), row[:5]), reverse = True)[:top_k]
+    return sorted(top, key = lambda row: (-row[5][metric], -row[5]["sup"], -row[5]["conf"]))
+
+def main():
+    parser = argparse.ArgumentParser(description = "Check that top-K mining gives the first K rules of the full rule set sorted by the metric.")
+    parser.add_argument("datafile", nargs = "?", default = GROCERIES, help = "data file, groceries by default")
+    parser.add_argument("--fixed-length", action = "store_true", help = "the data file is a fixed-length CSV")
+    parser.add_argument("--top-k", type = int, nargs = "+", default = [1, 10, 100])
+    parser.add_argument("--workers", type = int, nargs = "+", default = [1, 4])
+    parser.add_argument("--min-sup", type = int, default = 100)
+    parser.add_argument("--min-conf", type = float, default = 0.1)
+    args = parser.parse_args()
+
+    parameters = {"min_sup": args.min_sup, "min_conf": args.min_conf}
+    result = mine_rules(args.datafile, parameters, args.fixed_length)
+    if result == None:
+        print(f"[ERROR] Mining '{args.datafile}' failed.")
+        return 1
+    rules, n_transactions = result
+    rows = rule_rows(rules, n_transactions)
+
+    failed = False
+    for metric in sorted(TOP_K_METRICS):
+        for top_k in args.top_k:
+            expected = [row[:2] + (row[5],) for row in expected_top_rules(rows, metric, top_k, n_transactions)]
+            for workers in args.workers:
+                case = f"{metric}, K={top_k}, {workers} workers"
+                result = mine_rules(args.datafile, dict(parameters, top_k = top_k, top_k_metric = metric, workers = workers), args.fixed_length)
+                if result == None:
+                    print(f"[ERROR] {case}: mining failed.")
+                    failed = True
+                    continue
+                found = [row[:2] + (row[5],) for row in rule_rows(*result)]
+                if found != expected:
+                    differing = len(set(row[:2] for row in found) ^ set(row[:2] for row in expected))
+                    print(f"[ERROR] {case}: top-K mining found {len(found)} rules, the sorted rule set {len(expected)}; " + \
+                          f"{differing} rules differ" + (", the others are ranked differently." if differing == 0 else "."))
+                    failed = True
+                else:
+                    print(f"[INFO] {case}: top-K mining found the first {len(found)} rules of the sorted rule set.")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
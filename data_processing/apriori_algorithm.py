@@ -1,231 +1,199 @@
 from itertools import combinations
 import math
 
+from data_processing.association_rules import AssociationRuleGenerator
+from data_processing.item_bitmaps import build_item_bitmaps, popcount
+from data_processing.mining_progress import MiningProgress
+from data_processing.run_stats import RunStats
+from data_processing.support_cache import SupportCache
+from data_processing.transaction_database import TransactionDatabase
+
 class Apriori:
-    def __init__(self, min_sup: int = None, min_conf: float = None):
+    def __init__(self, min_sup: int = None, min_conf: float = None, counting: str = "bitset", support_cache: SupportCache = None, progress: MiningProgress = None, stats: RunStats = None):
         self.__min_sup = min_sup
         self.__min_conf = min_conf
+        self.__counting = counting
+        self.__progress = progress
 
-        self.__row_data = []
-        self.__unique_items = {}
+        # Phase times, per-level counts and counters of the search; may be shared with the caller
+        self.__stats = RunStats() if stats == None else stats
 
-        self.__frequent_sets = {}
-        self.__strong_association_rules = [] # list of pairs of sets [(X, Y)], where X and Y are sets
+        # Items are dense integer ids from the database's item dictionary, so every
+        # itemset is a sorted tuple of ids and can be joined lexicographically
+        self.__database: TransactionDatabase = None
+
+        self.__frequent_sets = {} # size -> {frequent itemset (sorted tuple of item ids): support}, in sorted order
+
+        # Supports of counted itemsets that are not frequent. The cache is bounded and may be
+        # shared between runs over the same database, so lookups can skip counting entirely.
+        self.__sup_cache = SupportCache() if support_cache is None else support_cache
 
-        self.__sup_cache = {}
-        self.__conf_cache = {}
+        # Vertical representation used by the "bitset" counting engine: every item
+        # (and every frequent set of the current level) maps to an int whose bit t
+        # is set if transaction t contains it
+        self.__item_bitmaps = {}
+        self.__set_bitmaps = {}
 
         self.__n_transactions = 0
 
-    def run(self, row_data: list = [], unique_items = None):
-        self.__row_data = row_data
-        self.__n_transactions = len(self.__row_data)
-        self.__unique_items = unique_items
+    def run(self, database: TransactionDatabase):
+        with self.__stats.phase("frequent_sets"):
+            supports = self.mine_frequent_sets(database)
+
+        rule_generator = AssociationRuleGenerator(min_conf = self.__min_conf, stats = self.__stats)
+        return rule_generator.run(supports, self.__n_transactions, database.item_names)
+
+    def mine_frequent_sets(self, database: TransactionDatabase) -> dict:
+        self.__database = database
+        self.__n_transactions = database.n_transactions()
         self.__find_frequent_sets()
-        self.__find_strong_association_rules()
-
-        rules_data = []
-        for rule in self.__strong_association_rules:
-            rule_data = {
-                "rule": rule,
-                "sup": self.__sup(rule[0] | rule[1]),
-                "rsup": self.__rsup(rule[0] | rule[1]),
-                "conf": self.__conf(rule[0], rule[1]),
-                "lift": self.__lift(rule[0], rule[1]),
-                "cosine": self.__cosine(rule[0], rule[1]),
-                "jaccard": self.__jaccard(rule[0], rule[1]),
-                "cf": self.__certainty_factor(rule[0], rule[1])
-            }
-            rules_data.append(rule_data)
-
-        return rules_data
+
+        supports = {}
+        for level_sets in self.__frequent_sets.values():
+            supports.update(level_sets)
+        return supports
+
+    def stats(self) -> RunStats:
+        return self.__stats
 
     def __find_frequent_sets(self):
         self.__frequent_sets = {}
+        self.__set_bitmaps = {}
 
-        # Initialize by setting the frequent sets of size 0 and 1
-        self.__add_frequent_set({})
+        # Initialize by setting the frequent sets of size 1, counted in one pass over the item ids
         current_level = 1
-        for item in self.__unique_items:
-            temp_set = {item}
-            if self.__is_frequent(temp_set):
-                self.__add_frequent_set(temp_set)
+        level_sets = {}
+        # Items a reduced database dropped have a support below min_item_support, but not the one counted
+        min_item_support = self.__database.metadata.get("min_item_support", 0)
+        with self.__stats.phase("item_counting"):
+            for item, sup in enumerate(self.__database.item_supports().tolist()):
+                if sup >= self.__min_sup:
+                    level_sets[(item,)] = sup
+                elif sup >= min_item_support:
+                    self.__sup_cache.put((item,), sup)
+        print(f"[INFO] Level 1: {self.__database.n_items()} candidates counted, {len(level_sets)} frequent.")
+        self.__stats.add_level(level = 1, generated = self.__database.n_items(), pruned = 0, cached = 0, counted = self.__database.n_items(), frequent = len(level_sets))
+
+        # Bitmaps are only needed for frequent items, built in one more pass over the data
+        if self.__counting == "bitset":
+            with self.__stats.phase("bitmap_building"):
+                self.__item_bitmaps = build_item_bitmaps(self.__database, [frequent_set[0] for frequent_set in level_sets])
+                self.__set_bitmaps = {(item,): bitmap for item, bitmap in self.__item_bitmaps.items()}
 
         # Loop over frequent sets for size equal to current_level
-        while current_level in self.__frequent_sets:
-            print(f"[INFO] Searching for candidates of size {current_level}")
-            current_level_frequent_sets = self.__get_frequent_sets(current_level)      
-
-            for i in range(len(current_level_frequent_sets)):
-                for j in range(i + 1, len(current_level_frequent_sets)):
-                    set1 = current_level_frequent_sets[i]
-                    set2 = current_level_frequent_sets[j]
-
-                    # Merge two sets if they have k - 1 items in common
-                    if len(set1.intersection(set2)) == current_level - 1:
-                        new_candidate = set1.union(set2)
-                        if len(new_candidate) == current_level + 1:
-                            if self.__is_frequent(new_candidate):
-                                self.__add_frequent_set(new_candidate)
-            print(f"    |---- Done. found {len(self.__frequent_sets[current_level])}.")
-            current_level += 1
-
-    def __find_strong_association_rules(self):
-        if self.__frequent_sets == None or len(self.__frequent_sets) == 0:
-            return
-
-        self.__strong_association_rules = []
-        current_level = 1
-        while current_level in self.__frequent_sets:
-            n = 0
-            print(f"[INFO] Searching for strong rules of size {current_level}.")
-            current_level_frequent_sets = self.__get_frequent_sets(current_level)      
-
-            for frequent_set in current_level_frequent_sets:
-                all_rule_combinations = self.__generate_combinations(frequent_set)
-
-                for rule in all_rule_combinations:
-                    if self.__is_strong_ar(rule[0], rule[1]):
-                        self.__strong_association_rules.append(rule)
-                        n += 1
-            
-            print(f"    |---- Done. Found {n}.")
+        while len(level_sets) > 0:
+            self.__frequent_sets[current_level] = level_sets
+            print(f"[INFO] Searching for candidates of size {current_level + 1}")
+            with self.__stats.phase("candidate_generation"):
+                candidates, n_generated, n_pruned = generate_candidates(list(level_sets))
+
+                # Candidates already known to be infrequent are skipped without counting
+                uncounted = []
+                for candidate in candidates:
+                    sup = self.__sup_cache.get(candidate[0])
+                    if sup == None or sup >= self.__min_sup:
+                        uncounted.append(candidate)
+
+            parent_bitmaps = self.__set_bitmaps
+            self.__set_bitmaps = {}
+            next_level_sets = {}
+            with self.__stats.phase("support_counting"):
+                if self.__counting == "scan":
+                    counts = self.__count_candidates(uncounted)
+                for candidate, parent1, parent2 in uncounted:
+                    if self.__counting == "bitset":
+                        # One AND of the parents' bitmaps instead of a full scan
+                        bitmap = parent_bitmaps[parent1] & parent_bitmaps[parent2]
+                        sup = popcount(bitmap)
+                        if sup >= self.__min_sup:
+                            self.__set_bitmaps[candidate] = bitmap
+                    else:
+                        sup = counts[candidate]
+
+                    if sup >= self.__min_sup:
+                        next_level_sets[candidate] = sup
+                    else:
+                        self.__sup_cache.put(candidate, sup)
+            self.__stats.count("support_counts", len(uncounted))
+
+            print(f"    |---- Level {current_level + 1}: {n_generated} candidates generated, {n_pruned} pruned, " + \
+                  f"{len(candidates) - len(uncounted)} cached as infrequent, {len(uncounted)} counted, {len(next_level_sets)} frequent.")
+            self.__stats.add_level(
+                level = current_level + 1, generated = n_generated, pruned = n_pruned,
+                cached = len(candidates) - len(uncounted), counted = len(uncounted), frequent = len(next_level_sets)
+            )
+            if self.__progress != None:
+                self.__progress.update("frequent sets", level = current_level + 1, counted = len(uncounted), frequent = len(next_level_sets))
+            level_sets = next_level_sets
             current_level += 1
-
-        print(f"[INFO] {len(self.__strong_association_rules)} strong association rules found in total.")
-
-    def __get_frequent_sets(self, size: int):
-        if size not in self.__frequent_sets:
-            return []
-        
-        frequent_sets_frozen = self.__frequent_sets[size]
-        frequent_sets_unfrozen = []
-
-        for frozen_set in frequent_sets_frozen:
-            frequent_sets_unfrozen.append(set(frozen_set))
-
-        return frequent_sets_unfrozen
-
-    def __add_frequent_set(self, X: set):
-        size = len(X)
-        if size not in self.__frequent_sets:
-            self.__frequent_sets[size] = {frozenset(X)}
-        else:
-            self.__frequent_sets[size].add(frozenset(X))
-
-    def __generate_combinations(self, X: set):
-        all_combinations = []
-        for r in range(1, len(X)):
-            for subset in combinations(X, r):
-                all_combinations.append((set(subset), X - set(subset)))
-        return all_combinations
-
-    def __is_frequent(self, X: set):
-        return True if self.__sup(X) >= self.__min_sup else False
-
-    def __is_strong_ar(self, X: set, Y: set):
-        return True if self.__conf(X, Y) >= self.__min_conf and self.__is_frequent(X | Y) else False
-
-    def __sup(self, X: set, Y = None) -> int:
-        if X == None:
-            return -1
-        
-        if len(X) == 0:
-            X = set()
-        if Y == None or len(Y) == 0:
-            Y = set()
-
-        union = X | Y
-
-        # Retrieve cached value if present
-        if frozenset(union) in self.__sup_cache:
-            return self.__sup_cache[frozenset(union)]
-
-        sup = 0
-        for row_set in self.__row_data:
-            if union.issubset(row_set):
-                sup += 1
-
-        # Cache value
-        self.__sup_cache[frozenset(union)] = sup
-
-        return sup
-    
-    def __rsup(self, X: set, Y = None) -> float:
-        return self.__sup(X, Y) / self.__n_transactions
-
-    def __conf(self, X: set, Y: set):
-        if X == None or Y == None:
-            return -1
-        
-        if len(X) == 0:
-            X = set()
-        if len(Y) == 0:
-            Y = set()
-
-        rule = (frozenset(X), frozenset(Y))
-
-        # Retrieve cached value if present
-        if rule in self.__conf_cache:
-            return self.__conf_cache[rule]
-        
-        conf = float(self.__sup(X, Y) / self.__sup(X))
-
-        # Cache value
-        self.__conf_cache[rule] = conf
-
-        return conf
-    
-    def __lift(self, X: set, Y: set):
-        if X == None or Y == None:
-            return -1
-        
-        if len(X) == 0:
-            X = set()
-        if len(Y) == 0:
-            Y = set()
-
-        lift = self.__conf(X, Y) / self.__rsup(Y)
-
-        return lift
-    
-    def __cosine(self, X: set, Y: set):
-        if X == None or Y == None:
-            return -1
-        
-        if len(X) == 0:
-            X = set()
-        if len(Y) == 0:
-            Y = set()
-
-        return self.__rsup(X, Y) / math.sqrt(self.__rsup(X) * self.__rsup(Y))
-
-    def __jaccard(self, X: set, Y: set):
-        if X == None or Y == None:
-            return -1
-        
-        if len(X) == 0:
-            X = set()
-        if len(Y) == 0:
-            Y = set()
-
-        return self.__rsup(X, Y) / (self.__rsup(X) + self.__rsup(Y) - self.__rsup(X, Y))
-
-    def __certainty_factor(self, X: set, Y: set):
-        if X == None or Y == None:
-            return -1
-        
-        if len(X) == 0:
-            X = set()
-        if len(Y) == 0:
-            Y = set()
-
-        prob_Y = self.__rsup(Y)
-        conf_XY = self.__conf(X, Y)
-
-        if conf_XY > prob_Y:
-            return (conf_XY - prob_Y) / (1 - prob_Y)
-        elif conf_XY == prob_Y:
-            return 0
-        else:
-            return -1 * ((prob_Y - conf_XY) / prob_Y)
\ No newline at end of file
+        self.__set_bitmaps = {}
+
+        stats = self.__sup_cache.stats()
+        self.__stats.set("support_cache", stats)
+        print(f"[INFO] Support cache: {stats['entries']} entries, {stats['hits']} hits, " + \
+              f"{stats['misses']} misses, {stats['evictions']} evictions.")
+
+    def __count_candidates(self, candidates: list) -> dict:
+        # Count all candidates of one level in a single sequential pass over the transactions
+        counts = {candidate: 0 for candidate, parent1, parent2 in candidates}
+        if len(candidates) == 0:
+            return counts
+        items = {item for candidate in counts for item in candidate}
+        k = len(candidates[0][0])
+
+        n_enumerated = 0
+        n_checked = 0
+        for row, weight in self.__database.weighted_rows():
+            row = [item for item in row if item in items]
+            if len(row) < k:
+                continue
+            # Enumerate the k-subsets of short rows, test every candidate against long ones
+            if math.comb(len(row), k) <= len(counts):
+                n_enumerated += 1
+                for subset in combinations(row, k):
+                    if subset in counts:
+                        counts[subset] += weight
+            else:
+                n_checked += 1
+                row_set = set(row)
+                for candidate in counts:
+                    if row_set.issuperset(candidate):
+                        counts[candidate] += weight
+
+        self.__stats.count("transaction_passes")
+        self.__stats.count("rows_enumerated", n_enumerated)
+        self.__stats.count("rows_checked_against_candidates", n_checked)
+        return counts
+
+def generate_candidates(level_sets: list):
+    # Lexicographic prefix join: two sorted k-sets are merged only if they share the
+    # first k - 1 items, so every (k + 1)-candidate is generated exactly once.
+    # level_sets is sorted, hence sets sharing a prefix are contiguous.
+    frequent = set(level_sets)
+    candidates = []
+    n_generated = 0
+    n_pruned = 0
+
+    block_start = 0
+    while block_start < len(level_sets):
+        prefix = level_sets[block_start][:-1]
+        block_end = block_start + 1
+        while block_end < len(level_sets) and level_sets[block_end][:-1] == prefix:
+            block_end += 1
+
+        for i in range(block_start, block_end):
+            set1 = level_sets[i]
+            for j in range(i + 1, block_end):
+                set2 = level_sets[j]
+                candidate = set1 + set2[-1:]
+                n_generated += 1
+
+                # Apriori prune: every k-subset of the candidate has to be frequent. Subsets
+                # obtained by dropping one of the last two items are set1 and set2 themselves.
+                if all(candidate[:d] + candidate[d + 1:] in frequent for d in range(len(candidate) - 2)):
+                    candidates.append((candidate, set1, set2))
+                else:
+                    n_pruned += 1
+        block_start = block_end
+
+    return candidates, n_generated, n_pruned
\ No newline at end of file
@@ -1,22 +1,45 @@
 import pandas as pd
 import numpy as np
 import csv
+import os
 from scipy.io import arff
-import matplotlib.pyplot as plt
 
 from data_processing.apriori_algorithm import Apriori
+from data_processing.fpgrowth_algorithm import FPGrowth
+from data_processing.eclat_algorithm import Eclat
+from data_processing.son_algorithm import SON
+from data_processing.toivonen_algorithm import Toivonen
+from data_processing.association_rules import TOP_K_METRICS, AssociationRuleGenerator
+from data_processing.closed_itemsets import ClosedSupports, closed_itemsets, maximal_itemsets
+from data_processing.rule_table import RuleTable
+from data_processing import rule_export
+from data_processing.mining_progress import MiningCancelled, MiningProgress
+from data_processing.run_stats import RunStats
+from data_processing.support_cache import SupportCache
+from data_processing.itemset_lattice import ItemsetLattice
+from data_processing.transaction_database import TransactionDatabase
+from data_processing.streaming_ingestion import StreamingIngestor
 
 class AprioriDataProcessor:
     def __init__(self):
-        self.__raw_rows = []
+        self.__transactions: TransactionDatabase = None
+        self.__support_cache: SupportCache = None
+
+        # Results kept between runs on the same transactions, so threshold changes avoid re-mining
+        self.__lattice: ItemsetLattice = None
+        self.__mined_rules: RuleTable = None
+        self.__mined_rules_thresholds = (None, None)
         self.__df: pd.DataFrame = None
         self.__dimension = 0
-        self.__unique_items = None
 
         self.__supported_datafiles = {"csv", "arff"}
+        self.__supported_engines = {"apriori", "fpgrowth", "eclat"}
         self.__parameters = {}
 
-        self.__rules = []
+        self.__rules = RuleTable()
+        self.__stats = RunStats() # phase times, counts and memory use of the last run
+        self.__progress: MiningProgress = None # progress reporting and cancellation of the current run
+        self.__sampling_report: dict = None # sample size, error bound and exactness of the last sampled run
 
     def set_parameters(self, parameters: dict = {}):
         if parameters == {}:
@@ -24,13 +47,29 @@ class AprioriDataProcessor:
             return
         self.__parameters = parameters
 
-    def process_data(self, filepath: str, fixed_length = True, ommit_first_column = True):
-        self.__load_data_file(filepath, fixed_length, ommit_first_column)
+    def process_data(self, filepath: str, fixed_length = True, ommit_first_column = True, progress: MiningProgress = None):
+        # Profiling and memory tracing are opt-in, the stats can be written as JSON or returned with the rules
+        self.__stats = RunStats(profile_path = self.__parameters.get("profile"), trace_memory = self.__parameters.get("trace_memory", False) == True)
+        self.__stats.start()
+        try:
+            result = self.__run(filepath, fixed_length, ommit_first_column, progress)
+        finally:
+            self.__stats.stop()
+        self.__write_stats()
+
+        if result != None and self.__parameters.get("return_stats", False) == True:
+            return (*result, self.__stats)
+        return result
+
+    def __run(self, filepath: str, fixed_length = True, ommit_first_column = True, progress: MiningProgress = None):
+        with self.__stats.phase("load"):
+            self.__load_data_file(filepath, fixed_length, ommit_first_column)
+        print(f"[INFO] Data loaded in {self.__stats.timings()['load']:.3f} s.")
 
-        if self.__raw_rows == None or self.__raw_rows == []:
+        if self.__transactions == None:
             print(f"[ERROR] Could not run the processing. Data was not loaded!")
             return
-        if self.__raw_rows == None or len(self.__raw_rows) == 0:
+        if len(self.__transactions) == 0:
             print(f"[ERROR] Row data supplied for Apriori algorithm is empty.")
             return
         if self.__parameters["min_sup"] == None or self.__parameters["min_sup"] < 0:
@@ -39,45 +78,299 @@ class AprioriDataProcessor:
         if self.__parameters["min_conf"] == None or self.__parameters["min_conf"] < 0 or self.__parameters["min_conf"] > 1:
             print(f"[ERROR] min_conf has to be a value between 0 and 1.")
             return
-        if self.__unique_items == None or len(self.__unique_items) == 0:
+        if self.__transactions.n_items() == 0:
             print(f"[ERROR] Unique item set is empty.")
             return
+        if self.__parameters.get("counting", "bitset") not in {"bitset", "scan"}:
+            print(f"[ERROR] counting has to be either 'bitset' or 'scan'.")
+            return
+        if self.__parameters.get("engine", "apriori") not in self.__supported_engines:
+            print(f"[ERROR] Mining engine '{self.__parameters['engine']}' is not supported!")
+            return
+        if self.__parameters.get("representation", "auto") not in {"auto", "tidset", "diffset"}:
+            print(f"[ERROR] representation has to be one of 'auto', 'tidset' or 'diffset'.")
+            return
+        if not isinstance(self.__parameters.get("workers", 1), int) or self.__parameters.get("workers", 1) < 1:
+            print(f"[ERROR] workers has to be a positive integer.")
+            return
+        top_k = self.__parameters.get("top_k")
+        if top_k != None and (not isinstance(top_k, int) or top_k < 1):
+            print(f"[ERROR] top_k has to be a positive integer.")
+            return
+        if self.__parameters.get("top_k_metric", "lift") not in TOP_K_METRICS:
+            print(f"[ERROR] top_k_metric has to be one of {', '.join(sorted(TOP_K_METRICS))}.")
+            return
+        if self.__parameters.get("itemsets", "all") not in {"all", "closed", "maximal"}:
+            print(f"[ERROR] itemsets has to be one of 'all', 'closed' or 'maximal'.")
+            return
+        if self.__parameters.get("sampling") not in {None, "exact", "approximate"}:
+            print(f"[ERROR] sampling has to be either 'exact' or 'approximate'.")
+            return
+        if not 0 < self.__parameters.get("sample_fraction", 0.1) <= 1:
+            print(f"[ERROR] sample_fraction has to be a value greater than 0 and at most 1.")
+            return
+        if not 0 < self.__parameters.get("sampling_delta", 0.01) < 1:
+            print(f"[ERROR] sampling_delta has to be a value between 0 and 1.")
+            return
+
+        self.__stats.set("parameters", dict(self.__parameters))
+        self.__stats.set("n_transactions", self.__transactions.n_transactions())
+        self.__stats.set("n_items", self.__transactions.n_items())
+
+        # Run selected mining algorithm, reusing what previous runs on the same data already found
+        self.__progress = progress
+        self.__sampling_report = None
+        try:
+            with self.__stats.phase("mining"):
+                itemsets = self.__parameters.get("itemsets", "all")
+                with self.__stats.phase("frequent_sets"):
+                    if itemsets == "all":
+                        supports, rule_itemsets = self.__find_frequent_sets(), None
+                    else:
+                        supports, rule_itemsets = self.__find_condensed_sets(itemsets)
+                self.__stats.set("n_frequent_sets", len(supports))
+                if self.__sampling_report != None:
+                    self.__stats.set("sampling", self.__sampling_report)
+                self.__rules = self.__find_strong_association_rules(supports, rule_itemsets)
+                # Hits and evictions of the support cache shared by the runs on these transactions
+                if self.__support_cache != None:
+                    self.__stats.set("support_cache", self.__support_cache.stats())
+        except MiningCancelled:
+            print(f"[INFO] Mining cancelled.")
+            self.__stats.set("cancelled", True)
+            return
+        finally:
+            self.__progress = None
+        self.__stats.set("n_rules", len(self.__rules))
+        print(f"[INFO] Mining finished in {self.__stats.timings()['mining']:.3f} s.")
+        return self.__sorted_results()
+
+    def append_transactions(self, rows: list, progress: MiningProgress = None):
+        # Adds transactions (lists of item names) to the loaded ones and updates the frequent
+        # sets found by the last run instead of mining the grown database from scratch
+        if self.__transactions == None or self.__lattice == None:
+            print(f"[ERROR] Transactions can only be appended after an incremental run on loaded data.")
+            return
+        if self.__transactions.metadata.get("min_item_support", 0) > 0:
+            print(f"[ERROR] Transactions loaded by streaming ingestion lack infrequent items, they cannot be appended to.")
+            return
+        if len(rows) == 0:
+            return self.__sorted_results()
+
+        self.__stats = RunStats()
+        old_transactions = self.__transactions
+        transactions = old_transactions.concatenate(TransactionDatabase.from_token_rows(rows))
+        delta_transactions = transactions.partition(len(old_transactions), len(transactions))
+        try:
+            with self.__stats.phase("update"):
+                self.__lattice.append(old_transactions, delta_transactions, progress)
+        except MiningCancelled:
+            print(f"[INFO] Update cancelled, the transactions were not appended.")
+            return
+
+        # The grown transactions no longer match any source file or store
+        self.__transactions = transactions
+        self.__transactions.metadata = {}
+        self.__count_unique_elements()
+
+        self.__mined_rules = None
+        with self.__stats.phase("update"):
+            self.__rules = self.__find_strong_association_rules(self.__lattice.frequent_sets(self.__parameters["min_sup"]))
+        self.__stats.set("n_transactions", self.__transactions.n_transactions())
+        self.__stats.set("n_rules", len(self.__rules))
+        print(f"[INFO] Update finished in {self.__stats.timings()['update']:.3f} s.")
+        return self.__sorted_results()
+
+    def timings(self) -> dict:
+        return self.__stats.timings()
+
+    def stats(self) -> RunStats:
+        return self.__stats
+
+    def sampling_report(self) -> dict:
+        return None if self.__sampling_report == None else dict(self.__sampling_report)
 
-        # Run Apriori algorithm
-        ap = Apriori(
+    def export_rules(self, path: str, format: str = None):
+        # Streams the rules of the last run, in the order they were returned, to JSON Lines, CSV or Parquet
+        with self.__stats.phase("export"):
+            rule_export.export_rules(self.__rules, path, format)
+        print(f"[INFO] {len(self.__rules)} rules written to '{path}' in {self.__stats.timings()['export']:.3f} s.")
+
+    def __write_stats(self):
+        stats_path = self.__parameters.get("stats_json")
+        if stats_path == None:
+            return
+        try:
+            self.__stats.to_json(stats_path)
+        except OSError as e:
+            print(f"[WARNING] Could not write run statistics to '{stats_path}': {e}")
+            return
+        print(f"[INFO] Run statistics written to '{stats_path}'.")
+
+    def __sorted_results(self):
+        with self.__stats.phase("sorting"):
+            # Top-K results are ranked by their metric first
+            self.__rules = self.__rules.sorted(self.__parameters.get("top_k_metric", "lift") if self.__parameters.get("top_k") != None else None)
+
+        # Columnar mode hands out the struct-of-arrays RuleTable instead of a list of dicts
+        if self.__parameters.get("columnar", False) == True:
+            return self.__rules, self.__transactions.n_transactions()
+        return self.__rules.to_dicts(), self.__transactions.n_transactions()
+    
+    def __find_frequent_sets(self) -> dict:
+        min_sup = self.__parameters["min_sup"]
+        # Sampled supports may be approximate and are never kept for later runs
+        incremental = self.__parameters.get("incremental", True) == True and self.__parameters.get("sampling") == None
+
+        if incremental and self.__lattice != None:
+            if min_sup < self.__lattice.min_sup:
+                self.__lattice.extend(self.__transactions, min_sup, self.__progress)
+            else:
+                print(f"[INFO] Filtering frequent sets mined at min_sup {self.__lattice.min_sup}.")
+            return self.__lattice.frequent_sets(min_sup)
+
+        miner = self.__create_miner()
+        supports = miner.mine_frequent_sets(self.__mining_transactions())
+        if isinstance(miner, Toivonen):
+            self.__sampling_report = miner.report()
+        if incremental:
+            self.__lattice = ItemsetLattice(min_sup, supports, self.__transactions.item_supports(), self.__get_support_cache())
+        return supports
+
+    def __find_condensed_sets(self, itemsets: str) -> tuple:
+        # Rules are built from the closed (or maximal) sets only, while their supports and those of
+        # all their subsets are recovered exactly from the closed sets. Eclat mines the closed sets
+        # directly (CHARM), the other engines mine every frequent set which is then reduced.
+        if self.__parameters.get("engine", "apriori") == "eclat" and self.__parameters.get("workers", 1) == 1 and self.__parameters.get("sampling") == None:
+            miner = Eclat(
+                min_sup = self.__parameters["min_sup"],
+                min_conf = self.__parameters["min_conf"],
+                itemsets = "closed",
+                progress = self.__progress
+            )
+            closed = miner.mine_frequent_sets(self.__mining_transactions())
+        else:
+            miner = self.__create_miner()
+            supports = miner.mine_frequent_sets(self.__mining_transactions())
+            if isinstance(miner, Toivonen):
+                self.__sampling_report = miner.report()
+            closed = closed_itemsets(supports)
+            print(f"[INFO] {len(closed)} of {len(supports)} frequent sets are closed.")
+            del supports
+
+        rule_itemsets = list(closed)
+        if itemsets == "maximal":
+            rule_itemsets = list(maximal_itemsets(closed))
+            print(f"[INFO] {len(rule_itemsets)} of {len(closed)} closed frequent sets are maximal.")
+        return ClosedSupports(closed), rule_itemsets
+
+    def __find_strong_association_rules(self, supports: dict, itemsets: list = None) -> RuleTable:
+        min_sup = self.__parameters["min_sup"]
+        min_conf = self.__parameters["min_conf"]
+        top_k = self.__parameters.get("top_k")
+        # Top-K and closed/maximal results are no supersets of the results at higher thresholds,
+        # so they are never reused, nor are rules built from sampled supports
+        incremental = self.__parameters.get("incremental", True) == True and top_k == None and itemsets == None and \
+                      self.__parameters.get("sampling") == None
+
+        # Rules mined at lower or equal thresholds contain every rule wanted now
+        if incremental and self.__mined_rules != None and min_sup >= self.__mined_rules_thresholds[0] and min_conf >= self.__mined_rules_thresholds[1]:
+            print(f"[INFO] Filtering strong rules mined at min_sup {self.__mined_rules_thresholds[0]}, min_conf {self.__mined_rules_thresholds[1]}.")
+            metrics = self.__mined_rules.metrics
+            return self.__mined_rules.take(np.flatnonzero((metrics["sup"] >= min_sup) & (metrics["conf"] >= min_conf)))
+
+        rule_generator = AssociationRuleGenerator(
+            min_conf = min_conf,
+            workers = self.__parameters.get("workers", 1),
+            progress = self.__progress,
+            top_k = top_k,
+            top_k_metric = self.__parameters.get("top_k_metric", "lift"),
+            stats = self.__stats
+        )
+        rules = rule_generator.run_columnar(supports, self.__transactions.n_transactions(), self.__transactions.item_names, itemsets)
+        if incremental:
+            self.__mined_rules = rules
+            self.__mined_rules_thresholds = (min_sup, min_conf)
+        return rules
+
+    def __mining_transactions(self) -> TransactionDatabase:
+        # Engines scanning the rows mine identical transactions once, weighted by their count.
+        # Items below min_sup are in no frequent set; without them more transactions are identical
+        # and merge as well. Item bitmaps span every transaction anyway, so the other engines mine
+        # the transactions as loaded, and so does the lattice. Streamed transactions are not
+        # meant to be held in memory and are never deduplicated.
+        scans_rows = self.__parameters.get("engine", "apriori") == "fpgrowth" or \
+                     (self.__parameters.get("engine", "apriori") == "apriori" and self.__parameters.get("counting", "bitset") == "scan")
+        if not scans_rows or self.__parameters.get("deduplicate", True) != True or self.__parameters.get("streaming", False) == True:
+            return self.__transactions
+        transactions = self.__transactions.deduplicate(min_item_support = self.__parameters["min_sup"])
+        print(f"[INFO] {len(transactions)} distinct transactions left after removing infrequent items.")
+        self.__stats.set("n_mined_transactions", len(transactions))
+        return transactions
+
+    def __get_support_cache(self) -> SupportCache:
+        if self.__support_cache == None:
+            self.__support_cache = SupportCache(max_bytes = self.__parameters.get("cache_max_bytes", 64 * 1024 * 1024))
+        return self.__support_cache
+
+    def __create_miner(self):
+        engine = self.__parameters.get("engine", "apriori")
+        if engine == "fpgrowth":
+            engine_class, engine_parameters = FPGrowth, {}
+        elif engine == "eclat":
+            engine_class, engine_parameters = Eclat, {"representation": self.__parameters.get("representation", "auto")}
+        else:
+            engine_class, engine_parameters = Apriori, {"counting": self.__parameters.get("counting", "bitset")}
+
+        # The sample is mined serially; workers still apply to rule generation
+        if self.__parameters.get("sampling") != None:
+            return Toivonen(
+                min_sup = self.__parameters["min_sup"],
+                min_conf = self.__parameters["min_conf"],
+                mode = self.__parameters["sampling"],
+                sample_fraction = self.__parameters.get("sample_fraction", 0.1),
+                delta = self.__parameters.get("sampling_delta", 0.01),
+                seed = self.__parameters.get("sample_seed"),
+                engine_class = engine_class,
+                engine_parameters = engine_parameters,
+                progress = self.__progress,
+                stats = self.__stats
+            )
+
+        workers = self.__parameters.get("workers", 1)
+        if workers > 1:
+            return SON(
+                min_sup = self.__parameters["min_sup"],
+                min_conf = self.__parameters["min_conf"],
+                workers = workers,
+                engine_class = engine_class,
+                engine_parameters = engine_parameters,
+                progress = self.__progress
+            )
+        if engine_class == Apriori:
+            # The support cache outlives single runs, so re-mining the same data skips known candidates
+            engine_parameters["support_cache"] = self.__get_support_cache()
+            engine_parameters["stats"] = self.__stats
+        return engine_class(
             min_sup = self.__parameters["min_sup"],
-            min_conf = self.__parameters["min_conf"]
+            min_conf = self.__parameters["min_conf"],
+            progress = self.__progress,
+            **engine_parameters
         )
-        self.__rules = ap.run(self.__raw_rows, self.__unique_items)
-        sorted_rules = sorted(self.__rules, key = lambda x: (-x["sup"], -x["conf"]))
 
-        return sorted_rules, len(self.__raw_rows)
-    
     def show_plots(self):
-        if self.__rules == []:
-            return
-
-        supports = []
-        confidences = []
-        lifts = []
-        cosines = []
-        jaccards = []
-        certainty_factors = []
-
-        for rule_data in self.__rules:
-            supports.append(rule_data["sup"])
-            confidences.append(rule_data["conf"])
-            lifts.append(rule_data["lift"])
-            cosines.append(rule_data["cosine"])
-            jaccards.append(rule_data["jaccard"])
-            certainty_factors.append(rule_data["cf"])
-
-        supports_array = np.sort(np.array(supports))
-        confidences_array = np.sort(np.array(confidences))
-        lifts_array = np.sort(np.array(lifts))
-        cosines_array = np.sort(np.array(cosines))
-        jaccards_array = np.sort(np.array(jaccards))
-        certainty_factors_array = np.sort(np.array(certainty_factors))
+        if len(self.__rules) == 0:
+            return
+
+        # Imported on first use, so batch runs never load matplotlib
+        import matplotlib.pyplot as plt
+
+        supports_array = np.sort(self.__rules.metrics["sup"])
+        confidences_array = np.sort(self.__rules.metrics["conf"])
+        lifts_array = np.sort(self.__rules.metrics["lift"])
+        cosines_array = np.sort(self.__rules.metrics["cosine"])
+        jaccards_array = np.sort(self.__rules.metrics["jaccard"])
+        certainty_factors_array = np.sort(self.__rules.metrics["cf"])
 
         # Create subplots
         fig, axs = plt.subplots(2, 2, figsize = (12, 10))
@@ -114,46 +407,133 @@ class AprioriDataProcessor:
         if ext not in self.__supported_datafiles:
             print(f"[ERROR] Could not load data. Data format '{ext}' is not supported!")
             return None
+        if ext == "arff":
+            # Loader options only apply to CSV files
+            fixed_length, ommit_first_column = False, False
+
+        # Reuse the transactions if they were loaded from the same, unchanged file with the same options
+        store_key = self.__store_key(filepath, fixed_length, ommit_first_column)
+        if self.__transactions != None and self.__is_store_usable(self.__transactions.metadata, store_key):
+            print(f"[INFO] Reusing transactions already loaded from '{filepath}'.")
+            self.__stats.set("transactions_source", "memory")
+            return
+
+        # Supports, itemsets and rules found for the previous transactions are meaningless for the new ones
+        self.__support_cache = None
+        self.__lattice = None
+        self.__mined_rules = None
+
+        # Otherwise try the binary store saved next to the source file by a previous run
+        store_path = self.__store_path(filepath, fixed_length, ommit_first_column)
+        use_store = self.__parameters.get("store_cache", True) == True
+        if use_store and self.__open_store(store_path, store_key):
+            print(f"[INFO] Opened transaction store '{store_path}'.")
+            self.__stats.set("transactions_source", "store")
+            self.__count_unique_elements()
+            return
 
         # Load appropriate data file format
+        self.__transactions = None
         if ext == "csv":
-            if fixed_length == True:
+            if self.__parameters.get("streaming", False) == True:
+                self.__load_csv_streaming(filepath, store_path, store_key, fixed_length, ommit_first_column)
+            elif fixed_length == True:
                 self.__load_csv_fixed(filepath, ommit_first_column)
             else:
                 self.__load_csv_non_fixed(filepath)
         elif ext == "arff":
-            self.__load_arff(filepath)   
-        self.__count_unique_elements()     
+            self.__load_arff(filepath)
+        self.__stats.set("transactions_source", "file")
+
+        if self.__transactions.metadata == {}:
+            self.__transactions.metadata = dict(store_key, min_item_support = 0)
+            if use_store:
+                self.__save_store(store_path)
+        self.__count_unique_elements()
+
+    def __store_key(self, filepath: str, fixed_length = True, ommit_first_column = False) -> dict:
+        stat = os.stat(filepath)
+        return {
+            "source": os.path.abspath(filepath),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "fixed_length": bool(fixed_length),
+            "ommit_first_column": bool(ommit_first_column)
+        }
+
+    def __store_path(self, filepath: str, fixed_length = True, ommit_first_column = False) -> str:
+        layout = "fixed" if fixed_length == True else "basket"
+        if ommit_first_column == True:
+            layout += "-omit"
+        return f"{filepath}.{layout}.tdb"
+
+    def __is_store_usable(self, metadata: dict, store_key: dict) -> bool:
+        # Stores written by streaming ingestion only hold items with support >= min_item_support
+        for key, value in store_key.items():
+            if metadata.get(key) != value:
+                return False
+        return metadata.get("min_item_support", 0) <= self.__min_item_support()
+
+    def __open_store(self, store_path: str, store_key: dict) -> bool:
+        if not os.path.exists(store_path):
+            return False
+        try:
+            database = TransactionDatabase.open(store_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WARNING] Could not open transaction store '{store_path}': {e}")
+            return False
+        if not self.__is_store_usable(database.metadata, store_key):
+            return False
+        self.__transactions = database
+        return True
+
+    def __save_store(self, store_path: str):
+        try:
+            self.__transactions.save(store_path)
+        except OSError as e:
+            print(f"[WARNING] Could not save transaction store '{store_path}': {e}")
+
+    def __min_item_support(self):
+        min_sup = self.__parameters.get("min_sup", 0)
+        if min_sup == None or min_sup < 0:
+            return 0
+        return min_sup
 
     def __count_unique_elements(self):
         print(f"[INFO] Counting number of unique items...")
-        self.__unique_items = set()
-        for row in self.__raw_rows:
-            self.__unique_items.update(row)
-        self.__dimension = len(self.__unique_items)
+        self.__dimension = self.__transactions.n_items()
         print(f"    |---- Done. Number of unique elements: {self.__dimension}")
 
+    def __load_csv_streaming(self, filepath, store_path, store_key, fixed_length = True, ommit_first_column = False):
+        # Transactions are never held in memory as a whole: they are read in chunks three times and
+        # written, reduced to frequent items, into the binary store next to the source file
+        # that mining then reads sequentially
+        ingestor = StreamingIngestor(chunk_size = self.__parameters.get("chunk_size", 100000))
+        self.__transactions = ingestor.ingest(
+            filepath,
+            store_path,
+            min_sup = self.__min_item_support(),
+            fixed_length = fixed_length,
+            ommit_first_column = ommit_first_column,
+            metadata = store_key
+        )
+
     def __load_csv_non_fixed(self, filepath):
-        self.__raw_rows = []
         with open(filepath, "r") as file:
-            for line in file:
-                row = {item.strip() for item in line.split(",")}
-                self.__raw_rows.append(row)
+            self.__transactions = TransactionDatabase.from_token_rows(
+                (item.strip() for item in line.split(",")) for line in file
+            )
 
     def __load_csv_fixed(self, filepath, ommit_first_column = False):
-        self.__raw_rows = []
         if ommit_first_column == True:
             columns = pd.read_csv(filepath, nrows = 0).columns
             self.__df = pd.read_csv(filepath, usecols = columns[1:])
         else:
             self.__df = pd.read_csv(filepath)
 
-        for index, row in self.__df.iterrows():
-            row_set = {f"{col}={row[col]}" for col in self.__df.columns if pd.notna(row[col])}
-            self.__raw_rows.append(row_set)
+        self.__transactions = TransactionDatabase.from_dataframe(self.__df)
         
     def __load_arff(self, filepath):
-        self.__raw_rows = []
         data, meta = arff.loadarff(filepath)
         self.__df = pd.DataFrame(data)
 
@@ -164,6 +544,4 @@ class AprioriDataProcessor:
             else:
                 self.__df[col] = self.__df[col].astype(int)
             
-        for index, row in self.__df.iterrows():
-            row_set = {f"{meta.names()[i]}={row.iloc[i]}" for i in range(len(meta.names()))}
-            self.__raw_rows.append(row_set)
+        self.__transactions = TransactionDatabase.from_dataframe(self.__df)
@@ -0,0 +1,254 @@
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+import math
+
+from data_processing.mining_progress import MiningProgress
+from data_processing.rule_table import RuleTable
+from data_processing.run_stats import RunStats
+
+TOP_K_METRICS = {"conf", "lift", "cosine", "jaccard", "cf"}
+
+# Absorbs rounding differences between metric bounds and the metric values they bound
+BOUND_SLACK = 1e-9
+
+class AssociationRuleGenerator:
+    def __init__(self, min_conf: float = None, workers: int = 1, progress: MiningProgress = None, top_k: int = None, top_k_metric: str = "lift",
+                 stats: RunStats = None):
+        self.__min_conf = min_conf
+        self.__workers = workers
+        self.__progress = progress
+
+        # With top_k set only the top_k confident rules by top_k_metric are kept, in a bounded heap
+        self.__top_k = top_k
+        self.__top_k_metric = top_k_metric
+
+        self.__supports = {} # sorted tuple of item ids -> absolute support, for every frequent itemset
+        self.__itemsets = None # itemsets X u Y the rules are built from, every key of supports if None
+        self.__item_names = []
+        self.__n_transactions = 0
+
+        # list of rules [(X, Y, sup(X u Y), sup(X), sup(Y))], where X and Y are sorted tuples of item ids
+        self.__strong_association_rules = []
+
+        # Time spent finding the rules and computing their metrics; may be shared with the caller
+        self.__stats = RunStats() if stats == None else stats
+
+    def run(self, supports: dict, n_transactions: int, item_names: list, itemsets: list = None):
+        return self.run_columnar(supports, n_transactions, item_names, itemsets).to_dicts()
+
+    def run_columnar(self, supports: dict, n_transactions: int, item_names: list, itemsets: list = None) -> RuleTable:
+        # supports only has to answer supports[itemset] for subsets of the itemsets, e.g. ClosedSupports
+        self.__supports = supports
+        self.__itemsets = itemsets
+        self.__n_transactions = n_transactions
+        self.__item_names = item_names
+
+        with self.__stats.phase("rules"):
+            self.__find_strong_association_rules()
+
+        with self.__stats.phase("metrics"):
+            rules = RuleTable.from_rules(self.__strong_association_rules, self.__n_transactions, self.__item_names)
+        return rules
+
+    def timings(self) -> dict:
+        return self.__stats.timings()
+
+    def __find_strong_association_rules(self):
+        self.__strong_association_rules = []
+        if self.__supports == None or len(self.__supports) == 0:
+            return
+
+        levels = {}
+        for frequent_set in (self.__supports if self.__itemsets == None else self.__itemsets):
+            if len(frequent_set) > 1:
+                levels.setdefault(len(frequent_set), []).append(frequent_set)
+
+        executor = None
+        if self.__workers > 1:
+            # Every worker receives the support table once and then generates the rules
+            # of whole batches of frequent itemsets
+            executor = ProcessPoolExecutor(
+                max_workers = self.__workers,
+                initializer = init_rule_worker,
+                initargs = (self.__supports, self.__min_conf, self.__n_transactions, self.__top_k, self.__top_k_metric)
+            )
+
+        top_rules = [] # min-heap of (metric value, rule) in top-K mode
+        try:
+            for current_level in sorted(levels):
+                print(f"[INFO] Searching for strong rules of size {current_level}.")
+                frequent_sets = levels[current_level]
+                if executor != None:
+                    batch_size = max(1, math.ceil(len(frequent_sets) / (4 * self.__workers)))
+                    batches = [frequent_sets[i:i + batch_size] for i in range(0, len(frequent_sets), batch_size)]
+
+                if self.__top_k != None:
+                    if executor == None:
+                        find_top_rules(self.__supports, frequent_sets, self.__min_conf, self.__n_transactions, self.__top_k, self.__top_k_metric, top_rules)
+                    else:
+                        # Workers prune against the threshold reached so far and return their local top K
+                        floor = top_rules[0][0] if len(top_rules) >= self.__top_k else -math.inf
+                        for batch_top_rules in executor.map(find_top_rules_in_worker, batches, [floor] * len(batches)):
+                            for value, rule in batch_top_rules:
+                                offer_rule(top_rules, self.__top_k, value, rule)
+                    threshold = top_rules[0][0] if len(top_rules) >= self.__top_k else None
+                    print(f"    |---- Done. Keeping {len(top_rules)}, {self.__top_k_metric} threshold {threshold}.")
+                    if self.__progress != None:
+                        self.__progress.update("rules", size = current_level, rules = len(top_rules))
+                    continue
+
+                if executor == None:
+                    rules = find_rules(self.__supports, frequent_sets, self.__min_conf)
+                else:
+                    rules = []
+                    for batch_rules in executor.map(find_rules_in_worker, batches):
+                        rules.extend(batch_rules)
+
+                self.__strong_association_rules.extend(rules)
+                print(f"    |---- Done. Found {len(rules)}.")
+                if self.__progress != None:
+                    self.__progress.update("rules", size = current_level, rules = len(self.__strong_association_rules))
+        finally:
+            if executor != None:
+                executor.shutdown()
+
+        if self.__top_k != None:
+            # Rules of equal value are kept and ordered by the rule tuples, i.e. by the item ids
+            # of their antecedents and then consequents, the larger first
+            self.__strong_association_rules = [rule for value, rule in sorted(top_rules, reverse = True)]
+            print(f"[INFO] Top {len(self.__strong_association_rules)} strong association rules by {self.__top_k_metric} kept.")
+            return
+        print(f"[INFO] {len(self.__strong_association_rules)} strong association rules found in total.")
+
+def find_rules(supports: dict, frequent_sets: list, min_conf: float) -> list:
+    # Confidence of X -> Y only drops when items move from X to Y, so consequents are grown
+    # level-wise from the confident ones (prefix join + subset prune, as in candidate
+    # generation) and a branch is abandoned as soon as its confidence falls below min_conf
+    rules = []
+    for frequent_set in frequent_sets:
+        sup_union = supports[frequent_set]
+        consequents = [(item,) for item in frequent_set]
+        while len(consequents) > 0 and len(consequents[0]) < len(frequent_set):
+            confident = []
+            for consequent in consequents:
+                antecedent = tuple(item for item in frequent_set if item not in consequent)
+                sup_antecedent = supports[antecedent]
+                if sup_union / sup_antecedent >= min_conf:
+                    confident.append(consequent)
+                    rules.append((antecedent, consequent, sup_union, sup_antecedent, supports[consequent]))
+            consequents = grow_consequents(confident)
+    return rules
+
+def grow_consequents(consequents: list) -> list:
+    # consequents are sorted tuples of equal length in lexicographic order
+    confident = set(consequents)
+    grown = []
+    for i in range(len(consequents)):
+        for j in range(i + 1, len(consequents)):
+            if consequents[i][:-1] != consequents[j][:-1]:
+                break
+            candidate = consequents[i] + consequents[j][-1:]
+            if all(candidate[:d] + candidate[d + 1:] in confident for d in range(len(candidate) - 2)):
+                grown.append(candidate)
+    return grown
+
+def find_top_rules(supports: dict, frequent_sets: list, min_conf: float, n_transactions: int, top_k: int, metric: str, top_rules: list, floor: float = -math.inf):
+    # Same consequent growth as find_rules, but rules compete for the top_k slots of the
+    # top_rules min-heap. Once the heap is full its minimum is a threshold: a consequent is
+    # only grown while metric_bound() says a rule from it could still beat the threshold, and
+    # whole itemsets are skipped the same way. floor is a threshold known from elsewhere.
+    frequent_sets = sorted(frequent_sets, key = lambda frequent_set: -metric_bound(metric, supports[frequent_set], supports[frequent_set], n_transactions))
+    for frequent_set in frequent_sets:
+        sup_union = supports[frequent_set]
+        # Itemsets are sorted by their bound, so no later one can beat the threshold either
+        if metric_bound(metric, sup_union, sup_union, n_transactions) + BOUND_SLACK < top_threshold(top_rules, top_k, floor):
+            break
+
+        consequents = [(item,) for item in frequent_set]
+        while len(consequents) > 0 and len(consequents[0]) < len(frequent_set):
+            promising = []
+            for consequent in consequents:
+                antecedent = tuple(item for item in frequent_set if item not in consequent)
+                sup_antecedent = supports[antecedent]
+                if sup_union / sup_antecedent < min_conf:
+                    continue
+                rule = (antecedent, consequent, sup_union, sup_antecedent, supports[consequent])
+                value = rule_metric(metric, sup_union, sup_antecedent, supports[consequent], n_transactions)
+                if value >= floor:
+                    offer_rule(top_rules, top_k, value, rule)
+                if metric_bound(metric, sup_union, sup_antecedent, n_transactions) + BOUND_SLACK >= top_threshold(top_rules, top_k, floor):
+                    promising.append(consequent)
+            consequents = grow_consequents(promising)
+    return top_rules
+
+def offer_rule(top_rules: list, top_k: int, value: float, rule: tuple):
+    if len(top_rules) < top_k:
+        heapq.heappush(top_rules, (value, rule))
+    elif (value, rule) > top_rules[0]:
+        heapq.heapreplace(top_rules, (value, rule))
+
+def top_threshold(top_rules: list, top_k: int, floor: float) -> float:
+    if len(top_rules) < top_k:
+        return floor
+    return max(floor, top_rules[0][0])
+
+def rule_metric(metric: str, sup_xy: int, sup_x: int, sup_y: int, n_transactions: int) -> float:
+    # Scalar counterpart of compute_metrics() for a single rule X -> Y
+    rsup_xy = sup_xy / n_transactions
+    rsup_x = sup_x / n_transactions
+    rsup_y = sup_y / n_transactions
+    conf = sup_xy / sup_x
+    if metric == "conf":
+        return conf
+    if metric == "lift":
+        return conf / rsup_y
+    if metric == "cosine":
+        return rsup_xy / math.sqrt(rsup_x * rsup_y)
+    if metric == "jaccard":
+        return rsup_xy / (rsup_x + rsup_y - rsup_xy)
+    if conf > rsup_y:
+        return (conf - rsup_y) / (1 - rsup_y)
+    if conf == rsup_y:
+        return 0.0
+    return -1 * ((rsup_y - conf) / rsup_y)
+
+def metric_bound(metric: str, sup_xy: int, sup_x: int, n_transactions: int) -> float:
+    # Upper bound of metric over every rule X' -> Y' with X' a subset of X and X' u Y' = X u Y.
+    # Such rules have sup(X') >= sup(X) and sup(Y') >= sup(X u Y), so conf' <= conf and:
+    #   lift' = n sup(X u Y) / (sup(X') sup(Y')) <= n / sup(X)
+    #   cosine' <= sup(X u Y) / sqrt(sup(X) sup(X u Y)) = sqrt(conf), jaccard' <= conf
+    #   cf' grows with conf' and falls with P(Y') >= P(X u Y)
+    # With sup_x = sup_xy it bounds every rule of the itemset X u Y.
+    conf = sup_xy / sup_x
+    if metric == "lift":
+        return n_transactions / sup_x
+    if metric == "cosine":
+        return math.sqrt(conf)
+    if metric == "cf":
+        rsup_xy = sup_xy / n_transactions
+        if rsup_xy >= 1:
+            return 0.0
+        return max(0.0, (conf - rsup_xy) / (1 - rsup_xy))
+    return conf
+
+# Worker state and entry points have to be module-level so they can be pickled
+
+worker_supports = {}
+worker_min_conf = None
+worker_n_transactions = 0
+worker_top_k = None
+worker_top_k_metric = None
+
+def init_rule_worker(supports: dict, min_conf: float, n_transactions: int = 0, top_k: int = None, top_k_metric: str = None):
+    global worker_supports, worker_min_conf, worker_n_transactions, worker_top_k, worker_top_k_metric
+    worker_supports = supports
+    worker_min_conf = min_conf
+    worker_n_transactions = n_transactions
+    worker_top_k = top_k
+    worker_top_k_metric = top_k_metric
+
+def find_rules_in_worker(frequent_sets: list) -> list:
+    return find_rules(worker_supports, frequent_sets, worker_min_conf)
+
+def find_top_rules_in_worker(frequent_sets: list, floor: float) -> list:
+    return find_top_rules(worker_supports, frequent_sets, worker_min_conf, worker_n_transactions, worker_top_k, worker_top_k_metric, [], floor)
\ No newline at end of file
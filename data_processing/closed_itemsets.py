@@ -0,0 +1,66 @@
+class ClosedSupports:
+    def __init__(self, closed: dict):
+        # Exact support of every frequent itemset, recovered from the closed ones: sup(X) is the
+        # largest support of a closed superset of X. Closed sets are numbered by descending
+        # support and every item maps to a bitmap of the closed sets holding it, so the lowest
+        # bit of the AND over the items of X is the closed superset with the largest support.
+        self.__itemsets = sorted(closed, key = lambda itemset: (-closed[itemset], itemset))
+        self.__supports = [closed[itemset] for itemset in self.__itemsets]
+        self.__item_masks = {}
+        for i, itemset in enumerate(self.__itemsets):
+            for item in itemset:
+                self.__item_masks[item] = self.__item_masks.get(item, 0) | (1 << i)
+
+    def __getitem__(self, itemset: tuple) -> int:
+        mask = self.__item_masks.get(itemset[0], 0)
+        for item in itemset[1:]:
+            mask &= self.__item_masks.get(item, 0)
+        if mask == 0:
+            raise KeyError(itemset)
+        return self.__supports[(mask & -mask).bit_length() - 1]
+
+    def get(self, itemset: tuple, default = None):
+        try:
+            return self[itemset]
+        except KeyError:
+            return default
+
+    def __contains__(self, itemset: tuple):
+        return self.get(itemset) != None
+
+    def __iter__(self):
+        return iter(self.__itemsets)
+
+    def __len__(self):
+        return len(self.__itemsets)
+
+def closed_itemsets(supports: dict) -> dict:
+    # Keeps the itemsets of a complete frequent set dict that have no superset of equal support;
+    # checking the immediate supersets is enough since support only drops along the lattice
+    not_closed = set()
+    for itemset, sup in supports.items():
+        if len(itemset) < 2:
+            continue
+        for d in range(len(itemset)):
+            subset = itemset[:d] + itemset[d + 1:]
+            if supports[subset] == sup:
+                not_closed.add(subset)
+    return {itemset: sup for itemset, sup in supports.items() if itemset not in not_closed}
+
+def maximal_itemsets(closed: dict) -> dict:
+    # Maximal sets are the closed sets without a frequent superset. Walking them by decreasing
+    # size, an itemset is maximal unless the bitmaps of the maximal sets holding each of its
+    # items still share one.
+    maximal = {}
+    item_masks = {}
+    for itemset in sorted(closed, key = len, reverse = True):
+        mask = item_masks.get(itemset[0], 0)
+        for item in itemset[1:]:
+            mask &= item_masks.get(item, 0)
+        if mask != 0:
+            continue
+        bit = 1 << len(maximal)
+        maximal[itemset] = closed[itemset]
+        for item in itemset:
+            item_masks[item] = item_masks.get(item, 0) | bit
+    return maximal
\ No newline at end of file
@@ -0,0 +1,156 @@
+import numpy as np
+
+from data_processing.association_rules import AssociationRuleGenerator
+from data_processing.item_bitmaps import build_item_bitmaps, popcount
+from data_processing.mining_progress import MiningProgress
+from data_processing.transaction_database import TransactionDatabase
+
+class Eclat:
+    def __init__(self, min_sup: int = None, min_conf: float = None, representation: str = "auto", itemsets: str = "all", progress: MiningProgress = None):
+        self.__min_sup = min_sup
+        self.__min_conf = min_conf
+        self.__progress = progress
+
+        # "tidset" intersects transaction id bitmaps (Eclat), "diffset" keeps only the
+        # ids lost with respect to the parent itemset (dEclat) and "auto" switches from
+        # tidsets to diffsets for every branch where diffsets become the smaller ones
+        self.__representation = representation
+
+        # "all" mines every frequent itemset, "closed" only the closed ones (CHARM, on tidsets)
+        self.__itemsets = itemsets
+
+        self.__supports = {} # sorted tuple of item ids -> support, for every frequent (or closed) itemset
+        self.__closed_index = {} # (support, hash of tidset) -> closed itemsets (frozensets) found so far
+        self.__n_transactions = 0
+
+    def run(self, database: TransactionDatabase):
+        supports = self.mine_frequent_sets(database)
+
+        rule_generator = AssociationRuleGenerator(min_conf = self.__min_conf)
+        return rule_generator.run(supports, self.__n_transactions, database.item_names)
+
+    def mine_frequent_sets(self, database: TransactionDatabase) -> dict:
+        self.__n_transactions = database.n_transactions()
+        self.__find_frequent_sets(database)
+        return self.__supports
+
+    def __find_frequent_sets(self, database: TransactionDatabase):
+        self.__supports = {}
+
+        # Tidsets are only built for frequent items
+        print(f"[INFO] Building item tidsets.")
+        item_supports = database.item_supports()
+        item_bitmaps = build_item_bitmaps(database, np.flatnonzero(item_supports >= self.__min_sup).tolist())
+
+        # Root equivalence class: frequent single items in ascending order of support,
+        # which keeps the tidsets of the deeper classes small
+        root_class = [((item,), bitmap, int(item_supports[item])) for item, bitmap in item_bitmaps.items()]
+        root_class.sort(key = lambda member: (member[2], member[0]))
+        del item_bitmaps
+        print(f"    |---- Done. Found {len(root_class)} frequent items.")
+
+        if self.__itemsets == "closed":
+            print(f"[INFO] Searching for closed frequent sets depth-first (tidset).")
+            self.__closed_index = {}
+            self.__mine_closed_class([(frozenset(itemset), bitmap, support) for itemset, bitmap, support in root_class], True)
+            self.__closed_index = {}
+            print(f"    |---- Done. Found {len(self.__supports)} closed frequent sets.")
+            return
+
+        print(f"[INFO] Searching for frequent sets depth-first ({self.__representation}).")
+        use_diffsets = self.__representation == "diffset"
+        if use_diffsets:
+            # Diffsets of single items with respect to the empty set
+            all_transactions = (1 << self.__n_transactions) - 1
+            root_class = [(itemset, all_transactions & ~bitmap, support) for itemset, bitmap, support in root_class]
+        self.__mine_class(root_class, use_diffsets)
+        print(f"    |---- Done. Found {len(self.__supports)} frequent sets.")
+
+    def __mine_class(self, members: list, use_diffsets: bool):
+        # members: [(itemset, tidset or diffset, support)] sharing the same prefix.
+        # Only the classes along the current branch are alive at any time.
+        for i in range(len(members)):
+            itemset_i, bitmap_i, support_i = members[i]
+            if len(itemset_i) == 1 and self.__progress != None:
+                # Root class members are the natural steps of the depth-first search
+                self.__progress.update("frequent sets", branch = i + 1, branches = len(members), frequent = len(self.__supports))
+            self.__supports[tuple(sorted(itemset_i))] = support_i
+
+            child_class = []
+            lost = 0
+            for j in range(i + 1, len(members)):
+                itemset_j, bitmap_j, support_j = members[j]
+                if use_diffsets:
+                    # d(PXY) = d(PY) - d(PX), sup(PXY) = sup(PX) - |d(PXY)|
+                    diffset = bitmap_j & ~bitmap_i
+                    support = support_i - popcount(diffset)
+                    if support >= self.__min_sup:
+                        child_class.append((itemset_i + itemset_j[-1:], diffset, support))
+                else:
+                    tidset = bitmap_i & bitmap_j
+                    support = popcount(tidset)
+                    if support >= self.__min_sup:
+                        child_class.append((itemset_i + itemset_j[-1:], tidset, support))
+                        lost += support_i - support
+
+            if len(child_class) == 0:
+                continue
+
+            # Switch the whole branch to diffsets once they are smaller than the tidsets:
+            # d(PXY) = t(PX) - t(PXY)
+            child_uses_diffsets = use_diffsets
+            if not use_diffsets and self.__representation == "auto" and lost < sum(member[2] for member in child_class):
+                child_class = [(itemset, bitmap_i ^ tidset, support) for itemset, tidset, support in child_class]
+                child_uses_diffsets = True
+
+            self.__mine_class(child_class, child_uses_diffsets)
+
+    def __mine_closed_class(self, members: list, root: bool = False):
+        # CHARM: members [(itemset, tidset, support)] in ascending order of support. Pairs with
+        # equal or nested tidsets are merged on the spot instead of being explored, so the search
+        # walks (almost) only closed itemsets.
+        members = list(members)
+        i = 0
+        while i < len(members):
+            if root and self.__progress != None:
+                self.__progress.update("frequent sets", branch = i + 1, branches = len(members), frequent = len(self.__supports))
+            itemset_i, tidset_i, support_i = members[i]
+
+            extensions = [] # [(itemset joined to itemset_i, tidset, support)]
+            j = i + 1
+            while j < len(members):
+                itemset_j, tidset_j, support_j = members[j]
+                tidset = tidset_i & tidset_j
+                support = popcount(tidset)
+                if support < self.__min_sup:
+                    j += 1
+                    continue
+
+                if support == support_i:
+                    # t(Xi) within t(Xj): Xj occurs wherever Xi does, so it belongs to Xi itself
+                    itemset_i = itemset_i | itemset_j
+                    if support == support_j:
+                        # Equal tidsets: nothing is left to explore for Xj on its own
+                        del members[j]
+                        continue
+                elif support == support_j:
+                    # t(Xj) within t(Xi): Xj only occurs together with Xi, explore it under Xi only
+                    del members[j]
+                    extensions.append((itemset_j, tidset, support))
+                    continue
+                else:
+                    extensions.append((itemset_j, tidset, support))
+                j += 1
+
+            if len(extensions) > 0:
+                child_class = [(itemset_i | itemset, tidset, support) for itemset, tidset, support in extensions]
+                child_class.sort(key = lambda member: member[2])
+                self.__mine_closed_class(child_class)
+
+            # A closed superset with the same support has the same tidset
+            key = (support_i, hash(tidset_i))
+            bucket = self.__closed_index.setdefault(key, [])
+            if not any(itemset_i <= closed_set for closed_set in bucket):
+                bucket.append(itemset_i)
+                self.__supports[tuple(sorted(itemset_i))] = support_i
+            i += 1
\ No newline at end of file
@@ -0,0 +1,120 @@
+from data_processing.association_rules import AssociationRuleGenerator
+from data_processing.mining_progress import MiningProgress
+from data_processing.transaction_database import TransactionDatabase
+
+class FPNode:
+    __slots__ = ("item", "count", "parent", "children")
+
+    def __init__(self, item: int = None, count: int = 0, parent = None):
+        self.item = item
+        self.count = count
+        self.parent = parent
+        self.children = {}
+
+class FPGrowth:
+    def __init__(self, min_sup: int = None, min_conf: float = None, progress: MiningProgress = None):
+        self.__min_sup = min_sup
+        self.__min_conf = min_conf
+        self.__progress = progress
+
+        # Position of every frequent item in the global "descending support" order,
+        # used to sort the items of each transaction before inserting it into a tree
+        self.__item_rank = {}
+
+        self.__supports = {} # sorted tuple of item ids -> support, for every frequent itemset
+        self.__n_transactions = 0
+
+    def run(self, database: TransactionDatabase):
+        supports = self.mine_frequent_sets(database)
+
+        rule_generator = AssociationRuleGenerator(min_conf = self.__min_conf)
+        return rule_generator.run(supports, self.__n_transactions, database.item_names)
+
+    def mine_frequent_sets(self, database: TransactionDatabase) -> dict:
+        self.__n_transactions = database.n_transactions()
+        self.__find_frequent_sets(database)
+        return self.__supports
+
+    def __find_frequent_sets(self, database: TransactionDatabase):
+        self.__supports = {}
+
+        # First pass: count supports of single items
+        print(f"[INFO] Counting supports of single items.")
+        item_counts = dict(enumerate(database.item_supports().tolist()))
+
+        frequent_items = [item for item, count in item_counts.items() if count >= self.__min_sup]
+        frequent_items.sort(key = lambda item: (-item_counts[item], item))
+        self.__item_rank = {item: rank for rank, item in enumerate(frequent_items)}
+        print(f"    |---- Done. Found {len(frequent_items)} frequent items.")
+
+        # Second pass: build the FP-tree from transactions reduced to their frequent items.
+        # Every transaction is inserted as it is read, so only the tree is held in memory.
+        print(f"[INFO] Building FP-tree.")
+        header = self.__build_tree(self.__ranked_transactions(database), item_counts)
+        print(f"    |---- Done.")
+
+        print(f"[INFO] Mining FP-tree.")
+        self.__mine_tree(header, item_counts, ())
+        print(f"    |---- Done. Found {len(self.__supports)} frequent sets.")
+
+    def __ranked_transactions(self, database: TransactionDatabase):
+        # Yields (frequent items in descending support order, weight) for every transaction
+        # that contains a frequent item
+        for row, weight in database.weighted_rows():
+            items = [item for item in row if item in self.__item_rank]
+            if len(items) > 0:
+                items.sort(key = self.__item_rank.__getitem__)
+                yield items, weight
+
+    def __build_tree(self, transactions, item_counts: dict):
+        # transactions: iterable of (items, count), read once. The header table maps
+        # every item to the list of tree nodes holding it.
+        root = FPNode()
+        header = {}
+        for items, count in transactions:
+            node = root
+            for item in items:
+                if item_counts[item] < self.__min_sup:
+                    continue
+                child = node.children.get(item)
+                if child is None:
+                    child = FPNode(item, 0, node)
+                    node.children[item] = child
+                    header.setdefault(item, []).append(child)
+                child.count += count
+                node = child
+        return header
+
+    def __mine_tree(self, header: dict, item_counts: dict, suffix: tuple):
+        # Process items from the least to the most frequent one, i.e. from the leaves up
+        items = sorted(header, key = self.__item_rank.__getitem__, reverse = True)
+        for branch, item in enumerate(items):
+            if len(suffix) == 0 and self.__progress != None:
+                # Top-level conditional trees are the natural steps of the depth-first search
+                self.__progress.update("frequent sets", branch = branch + 1, branches = len(items), frequent = len(self.__supports))
+            support = item_counts[item]
+            if support < self.__min_sup:
+                continue
+
+            frequent_set = tuple(sorted(suffix + (item,)))
+            self.__supports[frequent_set] = support
+
+            # Conditional pattern base: prefix paths of every node holding the item
+            pattern_base = []
+            conditional_counts = {}
+            for node in header[item]:
+                path = []
+                parent = node.parent
+                while parent.item is not None:
+                    path.append(parent.item)
+                    conditional_counts[parent.item] = conditional_counts.get(parent.item, 0) + node.count
+                    parent = parent.parent
+                if len(path) > 0:
+                    path.reverse()
+                    pattern_base.append((path, node.count))
+
+            if len(pattern_base) == 0:
+                continue
+            conditional_header = self.__build_tree(pattern_base, conditional_counts)
+            if len(conditional_header) > 0:
+                self.__mine_tree(conditional_header, conditional_counts, suffix + (item,))
\ No newline at end of file
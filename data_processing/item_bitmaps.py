@@ -0,0 +1,44 @@
+import numpy as np
+
+from data_processing.transaction_database import TransactionDatabase
+
+def build_item_bitmaps(database: TransactionDatabase, items = None) -> dict:
+    # Pack the transaction ids of every item into one int whose bit t is set
+    # if transaction t contains the item. The database is read in one sequential pass;
+    # when items is given, only bitmaps of those items are built. A deduplicated row of
+    # weight w stands for w transactions and is laid out on w consecutive bits, so plain
+    # popcounts keep giving supports.
+    n_bytes = (database.n_transactions() + 7) // 8
+    if database.weights is not None:
+        weights = np.asarray(database.weights, dtype = np.int64)
+        first_tids = np.cumsum(weights) - weights
+    rows = np.full(database.n_items(), -1, dtype = np.int64)
+    items = range(database.n_items()) if items is None else sorted(items)
+    rows[list(items)] = np.arange(len(items))
+    packed = np.zeros((len(items), n_bytes), dtype = np.uint8)
+
+    for start, indptr, indices in database.chunks():
+        row_ids = start + np.repeat(np.arange(len(indptr) - 1, dtype = np.int64), np.diff(indptr))
+        item_rows = rows[indices]
+        selected = item_rows >= 0
+        row_ids = row_ids[selected]
+        item_rows = item_rows[selected]
+        if database.weights is None:
+            tids = row_ids
+        else:
+            counts = weights[row_ids]
+            offsets = np.arange(counts.sum(), dtype = np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+            tids = np.repeat(first_tids[row_ids], counts) + offsets
+            item_rows = np.repeat(item_rows, counts)
+        np.bitwise_or.at(packed, (item_rows, tids >> 3), (1 << (tids & 7)).astype(np.uint8))
+
+    item_bitmaps = {}
+    for item in items:
+        bitmap = int.from_bytes(packed[rows[item]].tobytes(), "little")
+        if bitmap != 0:
+            item_bitmaps[item] = bitmap
+
+    return item_bitmaps
+
+def popcount(bitmap: int) -> int:
+    return bitmap.bit_count()
@@ -0,0 +1,168 @@
+import numpy as np
+
+from data_processing.apriori_algorithm import generate_candidates
+from data_processing.item_bitmaps import build_item_bitmaps, popcount
+from data_processing.mining_progress import MiningProgress
+from data_processing.support_cache import SupportCache
+from data_processing.transaction_database import TransactionDatabase
+
+class ItemsetLattice:
+    def __init__(self, min_sup: int, supports: dict, item_supports: np.ndarray, support_cache: SupportCache = None):
+        # supports holds every itemset with support >= min_sup; supports of counted itemsets
+        # below min_sup (the negative border and beyond) live in the bounded support cache
+        self.min_sup = min_sup
+        self.__supports = supports
+        self.__item_supports = item_supports
+        self.__sup_cache = SupportCache() if support_cache is None else support_cache
+
+    def frequent_sets(self, min_sup: int) -> dict:
+        # Raising min_sup only filters the stored itemsets
+        if min_sup < self.min_sup:
+            raise ValueError(f"Lattice was mined at min_sup {self.min_sup}, extend() it to reach {min_sup}.")
+        return {itemset: sup for itemset, sup in self.__supports.items() if sup >= min_sup}
+
+    def extend(self, database: TransactionDatabase, min_sup: int, progress: MiningProgress = None):
+        # Lowering min_sup re-runs the level-wise search, but every candidate whose support
+        # is already known (frequent before, or cached as infrequent) is taken as is and
+        # only the new candidates are counted, using item bitmaps built on first need
+        if min_sup >= self.min_sup:
+            return
+
+        print(f"[INFO] Extending frequent set lattice from min_sup {self.min_sup} to {min_sup}.")
+        current_level = 1
+        level_sets = {}
+        for item, sup in enumerate(self.__item_supports.tolist()):
+            if sup >= min_sup:
+                level_sets[(item,)] = sup
+
+        item_bitmaps = None
+        extended = {}
+        while len(level_sets) > 0:
+            extended.update(level_sets)
+            candidates, n_generated, n_pruned = generate_candidates(list(level_sets))
+
+            next_level_sets = {}
+            uncounted = []
+            for candidate, parent1, parent2 in candidates:
+                sup = self.__supports.get(candidate)
+                if sup == None:
+                    sup = self.__sup_cache.get(candidate)
+                if sup == None:
+                    uncounted.append(candidate)
+                elif sup >= min_sup:
+                    next_level_sets[candidate] = sup
+
+            if len(uncounted) > 0 and item_bitmaps == None:
+                item_bitmaps = build_item_bitmaps(database, [itemset[0] for itemset in extended if len(itemset) == 1])
+
+            prefix_bitmaps = {}
+            for candidate in uncounted:
+                prefix = candidate[:-1]
+                if prefix not in prefix_bitmaps:
+                    bitmap = item_bitmaps.get(prefix[0], 0)
+                    for item in prefix[1:]:
+                        bitmap &= item_bitmaps.get(item, 0)
+                    prefix_bitmaps[prefix] = bitmap
+                sup = popcount(prefix_bitmaps[prefix] & item_bitmaps.get(candidate[-1], 0))
+                if sup >= min_sup:
+                    next_level_sets[candidate] = sup
+                else:
+                    self.__sup_cache.put(candidate, sup)
+
+            print(f"    |---- Level {current_level + 1}: {len(candidates)} candidates, " + \
+                  f"{len(candidates) - len(uncounted)} known, {len(uncounted)} counted, {len(next_level_sets)} frequent.")
+            if progress != None:
+                progress.update("frequent sets", level = current_level + 1, counted = len(uncounted), frequent = len(next_level_sets))
+            level_sets = dict(sorted(next_level_sets.items()))
+            current_level += 1
+
+        self.__supports = extended
+        self.min_sup = min_sup
+
+    def append(self, old_database: TransactionDatabase, delta_database: TransactionDatabase, progress: MiningProgress = None):
+        # FUP-style update for transactions appended to old_database. Supports only grow, so an
+        # itemset's new support is its old one plus its count in the delta. Old supports are
+        # known for itemsets that were frequent and for the cached negative border; any other
+        # candidate had an old support below min_sup (and below that of its subsets), so the
+        # old data is rescanned only for candidates whose delta count could lift them over it.
+        min_sup = self.min_sup
+        n_items = delta_database.n_items()
+        item_supports = np.zeros(n_items, dtype = np.int64)
+        item_supports[:len(self.__item_supports)] = self.__item_supports
+        item_supports += delta_database.item_supports()
+
+        print(f"[INFO] Updating frequent set lattice with {delta_database.n_transactions()} appended transactions.")
+        current_level = 1
+        level_sets = {}
+        for item, sup in enumerate(item_supports.tolist()):
+            if sup >= min_sup:
+                level_sets[(item,)] = sup
+        frequent_items = [itemset[0] for itemset in level_sets]
+        delta_bitmaps = build_item_bitmaps(delta_database, frequent_items)
+        old_bitmaps = None
+
+        updated = {}
+        negative_border = {}
+        while len(level_sets) > 0:
+            updated.update(level_sets)
+            candidates, n_generated, n_pruned = generate_candidates(list(level_sets))
+
+            next_level_sets = {}
+            rescan = []
+            n_skipped = 0
+            for candidate, parent1, parent2 in candidates:
+                delta_sup = popcount(self.__and_bitmaps(delta_bitmaps, candidate))
+                old_sup = self.__old_sup(candidate)
+                if old_sup != None:
+                    self.__classify(candidate, old_sup + delta_sup, next_level_sets, negative_border)
+                    continue
+
+                upper_bound = min_sup - 1
+                for d in range(len(candidate)):
+                    subset_sup = self.__old_sup(candidate[:d] + candidate[d + 1:])
+                    if subset_sup != None:
+                        upper_bound = min(upper_bound, subset_sup)
+                if delta_sup + upper_bound >= min_sup:
+                    rescan.append((candidate, delta_sup))
+                else:
+                    n_skipped += 1
+
+            if len(rescan) > 0 and old_bitmaps == None:
+                old_bitmaps = build_item_bitmaps(old_database, [item for item in frequent_items if item < old_database.n_items()])
+            for candidate, delta_sup in rescan:
+                old_sup = popcount(self.__and_bitmaps(old_bitmaps, candidate))
+                self.__classify(candidate, old_sup + delta_sup, next_level_sets, negative_border)
+
+            print(f"    |---- Level {current_level + 1}: {len(candidates)} candidates, {len(candidates) - len(rescan) - n_skipped} known, " + \
+                  f"{len(rescan)} rescanned, {n_skipped} skipped, {len(next_level_sets)} frequent.")
+            if progress != None:
+                progress.update("frequent sets", level = current_level + 1, counted = len(rescan), frequent = len(next_level_sets))
+            level_sets = dict(sorted(next_level_sets.items()))
+            current_level += 1
+
+        # Cached supports refer to the old transactions; keep only the updated negative border
+        self.__supports = updated
+        self.__item_supports = item_supports
+        self.__sup_cache.clear()
+        for itemset, sup in negative_border.items():
+            self.__sup_cache.put(itemset, sup)
+
+    def __old_sup(self, itemset: tuple):
+        sup = self.__supports.get(itemset)
+        if sup == None:
+            sup = self.__sup_cache.get(itemset)
+        if sup == None and len(itemset) == 1:
+            sup = int(self.__item_supports[itemset[0]]) if itemset[0] < len(self.__item_supports) else 0
+        return sup
+
+    def __classify(self, itemset: tuple, sup: int, next_level_sets: dict, negative_border: dict):
+        if sup >= self.min_sup:
+            next_level_sets[itemset] = sup
+        else:
+            negative_border[itemset] = sup
+
+    def __and_bitmaps(self, item_bitmaps: dict, itemset: tuple) -> int:
+        bitmap = item_bitmaps.get(itemset[0], 0)
+        for item in itemset[1:]:
+            bitmap &= item_bitmaps.get(item, 0)
+        return bitmap
\ No newline at end of file
@@ -0,0 +1,28 @@
+import threading
+
+class MiningCancelled(Exception):
+    pass
+
+class MiningProgress:
+    def __init__(self, callback = None):
+        # callback receives one dict per finished step, e.g. {"stage": "frequent sets", "level": 2,
+        # "counted": 120, "frequent": 40}. It is called on the mining thread, so a GUI should only
+        # hand the event over (e.g. through a queue) instead of touching widgets.
+        self.__callback = callback
+        self.__cancel_event = threading.Event()
+
+    def cancel(self):
+        # May be called from any thread; mining stops at the next step boundary
+        self.__cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self.__cancel_event.is_set()
+
+    def check(self):
+        if self.__cancel_event.is_set():
+            raise MiningCancelled()
+
+    def update(self, stage: str, **counts):
+        if self.__callback != None:
+            self.__callback(dict(stage = stage, **counts))
+        self.check()
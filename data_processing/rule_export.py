@@ -0,0 +1,117 @@
+import csv
+import json
+import os
+
+from data_processing.rule_table import METRIC_COLUMNS, RuleTable
+
+SUPPORTED_FORMATS = {"json", "jsonl", "csv", "parquet"}
+
+def rule_format(path: str) -> str:
+    return path.split(".")[-1].lower()
+
+def check_format_dependencies(format: str):
+    # Raises ImportError if an optional package the format needs is missing, so callers
+    # can fail before mining rather than when writing the rules
+    if format == "parquet":
+        import_pyarrow()
+
+def export_rules(rules: RuleTable, path: str, format: str = None, batch_size: int = 65536):
+    # Rules are decoded and written batch_size at a time straight from the columnar arrays,
+    # so memory stays flat however many rules there are. The file is written under a
+    # temporary name and only replaces path once complete.
+    format = rule_format(path) if format == None else format
+    if format not in SUPPORTED_FORMATS:
+        raise ValueError(f"Rule export format '{format}' is not supported!")
+
+    tmp_path = f"{path}.tmp"
+    try:
+        if format == "json":
+            write_json(rules, tmp_path, batch_size)
+        elif format == "jsonl":
+            write_jsonl(rules, tmp_path, batch_size)
+        elif format == "csv":
+            write_csv(rules, tmp_path, batch_size)
+        else:
+            write_parquet(rules, tmp_path, batch_size)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+def write_json(rules: RuleTable, path: str, batch_size: int):
+    # One JSON array of the rule records, written batch by batch like JSON Lines
+    with open(path, "w", encoding = "utf-8") as file:
+        separator = "[\n"
+        for records in json_record_batches(rules, batch_size):
+            if len(records) == 0:
+                continue
+            file.write(separator + ",\n".join(records))
+            separator = ",\n"
+        file.write("[]" if separator == "[\n" else "\n]")
+
+def write_jsonl(rules: RuleTable, path: str, batch_size: int):
+    with open(path, "w", encoding = "utf-8") as file:
+        for records in json_record_batches(rules, batch_size):
+            file.write("\n".join(records) + "\n")
+
+def json_record_batches(rules: RuleTable, batch_size: int):
+    # Yields lists of rule records serialized as JSON objects
+    for antecedents, consequents, metrics in rule_batches(rules, batch_size):
+        records = []
+        for i in range(len(antecedents)):
+            record = {"antecedent": antecedents[i], "consequent": consequents[i]}
+            for column in METRIC_COLUMNS:
+                record[column] = metrics[column][i]
+            records.append(json.dumps(record, ensure_ascii = False))
+        yield records
+
+def write_csv(rules: RuleTable, path: str, batch_size: int):
+    # Itemsets are flattened to item names separated by ';'
+    with open(path, "w", newline = "", encoding = "utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["antecedent", "consequent"] + METRIC_COLUMNS)
+        for antecedents, consequents, metrics in rule_batches(rules, batch_size):
+            writer.writerows(zip(
+                (";".join(itemset) for itemset in antecedents),
+                (";".join(itemset) for itemset in consequents),
+                *(metrics[column] for column in METRIC_COLUMNS)
+            ))
+
+def write_parquet(rules: RuleTable, path: str, batch_size: int):
+    pa, pq = import_pyarrow()
+    schema = pa.schema(
+        [("antecedent", pa.list_(pa.string())), ("consequent", pa.list_(pa.string()))] + \
+        [(column, pa.int64() if column == "sup" else pa.float64()) for column in METRIC_COLUMNS]
+    )
+    with pq.ParquetWriter(path, schema) as writer:
+        for antecedents, consequents, metrics in rule_batches(rules, batch_size):
+            columns = {"antecedent": antecedents, "consequent": consequents}
+            columns.update(metrics)
+            writer.write_table(pa.table(columns, schema = schema))
+
+def import_pyarrow():
+    # pyarrow is optional and only needed for the Parquet format
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow, install it with 'pip install pyarrow'.")
+    return pa, pq
+
+def rule_batches(rules: RuleTable, batch_size: int):
+    # Yields (antecedents, consequents, metrics) for consecutive rules, itemsets as sorted
+    # lists of item names and metrics as lists of Python numbers
+    item_names = [str(name) for name in rules.item_names]
+    for start in range(0, len(rules), batch_size):
+        end = min(start + batch_size, len(rules))
+        antecedents = decode_itemsets(rules.antecedents, start, end, item_names)
+        consequents = decode_itemsets(rules.consequents, start, end, item_names)
+        metrics = {column: rules.metrics[column][start:end].tolist() for column in METRIC_COLUMNS}
+        yield antecedents, consequents, metrics
+
+def decode_itemsets(csr: tuple, start: int, end: int, item_names: list) -> list:
+    indptr, indices = csr
+    bounds = (indptr[start:end + 1] - indptr[start]).tolist()
+    names = [item_names[item] for item in indices[indptr[start]:indptr[end]].tolist()]
+    return [sorted(names[bounds[i]:bounds[i + 1]]) for i in range(end - start)]
\ No newline at end of file
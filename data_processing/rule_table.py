@@ -0,0 +1,120 @@
+from itertools import chain
+import numpy as np
+
+METRIC_COLUMNS = ["sup", "rsup", "conf", "lift", "cosine", "jaccard", "cf"]
+
+class RuleTable:
+    def __init__(self, item_names: list = [], antecedents: tuple = None, consequents: tuple = None, metrics: dict = None):
+        self.item_names = item_names
+
+        # Antecedents and consequents in CSR layout: (indptr, indices) of item ids
+        self.antecedents = (np.zeros(1, dtype = np.int64), np.zeros(0, dtype = np.int32)) if antecedents is None else antecedents
+        self.consequents = (np.zeros(1, dtype = np.int64), np.zeros(0, dtype = np.int32)) if consequents is None else consequents
+
+        # One array per metric, aligned with the rules
+        if metrics is None:
+            metrics = {column: np.zeros(0, dtype = np.int64 if column == "sup" else np.float64) for column in METRIC_COLUMNS}
+        self.metrics = metrics
+
+    @classmethod
+    def from_rules(cls, rules: list, n_transactions: int, item_names: list):
+        # rules: [(X, Y, sup(X u Y), sup(X), sup(Y))]. The supports are gathered into arrays
+        # once and every metric is computed for all rules in a single vectorized pass.
+        n_rules = len(rules)
+        sup_xy = np.fromiter((rule[2] for rule in rules), dtype = np.int64, count = n_rules)
+        sup_x = np.fromiter((rule[3] for rule in rules), dtype = np.int64, count = n_rules)
+        sup_y = np.fromiter((rule[4] for rule in rules), dtype = np.int64, count = n_rules)
+
+        return cls(
+            item_names,
+            to_csr([rule[0] for rule in rules]),
+            to_csr([rule[1] for rule in rules]),
+            compute_metrics(sup_xy, sup_x, sup_y, n_transactions)
+        )
+
+    def __len__(self):
+        return len(self.metrics["sup"])
+
+    def antecedent(self, i: int) -> set:
+        indptr, indices = self.antecedents
+        return {self.item_names[item] for item in indices[indptr[i]:indptr[i + 1]].tolist()}
+
+    def consequent(self, i: int) -> set:
+        indptr, indices = self.consequents
+        return {self.item_names[item] for item in indices[indptr[i]:indptr[i + 1]].tolist()}
+
+    def items_mask(self, item_ids, side: str = "any") -> np.ndarray:
+        # Boolean mask of the rules holding any of item_ids in the antecedent, the consequent or either
+        sides = {"antecedent": [self.antecedents], "consequent": [self.consequents], "any": [self.antecedents, self.consequents]}[side]
+        mask = np.zeros(len(self), dtype = bool)
+        for indptr, indices in sides:
+            row_ids = np.repeat(np.arange(len(self), dtype = np.int64), np.diff(indptr))
+            mask[row_ids[np.isin(indices, item_ids)]] = True
+        return mask
+
+    def take(self, order: np.ndarray):
+        # New table holding the rules at positions order, in that order
+        return RuleTable(
+            self.item_names,
+            take_csr(self.antecedents, order),
+            take_csr(self.consequents, order),
+            {column: values[order] for column, values in self.metrics.items()}
+        )
+
+    def sorted(self, column: str = None):
+        # Same order as the list mode: descending support, then descending confidence,
+        # optionally preceded by another descending metric column
+        keys = [-self.metrics["conf"], -self.metrics["sup"]]
+        if column != None:
+            keys.append(-self.metrics[column])
+        return self.take(np.lexsort(keys))
+
+    def to_dicts(self) -> list:
+        metrics = {column: values.tolist() for column, values in self.metrics.items()}
+        rules_data = []
+        for i in range(len(self)):
+            rule_data = {"rule": (self.antecedent(i), self.consequent(i))}
+            for column in METRIC_COLUMNS:
+                rule_data[column] = metrics[column][i]
+            rules_data.append(rule_data)
+        return rules_data
+
+def compute_metrics(sup_xy: np.ndarray, sup_x: np.ndarray, sup_y: np.ndarray, n_transactions: int) -> dict:
+    rsup_xy = sup_xy / n_transactions
+    rsup_x = sup_x / n_transactions
+    rsup_y = sup_y / n_transactions
+    conf = sup_xy / sup_x
+
+    # Certainty factor has three branches depending on how conf compares to P(Y);
+    # the branches that are not selected may divide by zero
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        cf = np.where(
+            conf > rsup_y,
+            (conf - rsup_y) / (1 - rsup_y),
+            np.where(conf == rsup_y, 0.0, -1 * ((rsup_y - conf) / rsup_y))
+        )
+
+    return {
+        "sup": sup_xy,
+        "rsup": rsup_xy,
+        "conf": conf,
+        "lift": conf / rsup_y,
+        "cosine": rsup_xy / np.sqrt(rsup_x * rsup_y),
+        "jaccard": rsup_xy / (rsup_x + rsup_y - rsup_xy),
+        "cf": cf
+    }
+
+def to_csr(itemsets: list) -> tuple:
+    indptr = np.zeros(len(itemsets) + 1, dtype = np.int64)
+    np.cumsum(np.fromiter((len(itemset) for itemset in itemsets), dtype = np.int64, count = len(itemsets)), out = indptr[1:])
+    indices = np.fromiter(chain.from_iterable(itemsets), dtype = np.int32, count = int(indptr[-1]))
+    return indptr, indices
+
+def take_csr(csr: tuple, order: np.ndarray) -> tuple:
+    indptr, indices = csr
+    lengths = np.diff(indptr)[order]
+    new_indptr = np.zeros(len(order) + 1, dtype = np.int64)
+    np.cumsum(lengths, out = new_indptr[1:])
+    # Position of every selected item in the old indices array
+    positions = np.repeat(indptr[:-1][order] - new_indptr[:-1], lengths) + np.arange(new_indptr[-1], dtype = np.int64)
+    return new_indptr, indices[positions]
\ No newline at end of file
@@ -0,0 +1,100 @@
+import contextlib
+import cProfile
+import io
+import json
+import platform
+import pstats
+import time
+import tracemalloc
+
+class RunStats:
+    def __init__(self, profile_path: str = None, trace_memory: bool = False):
+        # Structured record of one run: wall and CPU time per phase, per-level counts of the
+        # level-wise search, event counters and other facts (cache statistics, memory peaks).
+        # Profiling (cProfile, written to profile_path) and tracemalloc are opt-in as they slow
+        # the run down.
+        self.__phases = {} # name -> {"wall": seconds, "cpu": seconds, "calls": n}
+        self.__levels = []
+        self.__counters = {}
+        self.__values = {}
+
+        self.__profile_path = profile_path
+        self.__profiler = None
+        self.__trace_memory = trace_memory
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        # Repeated phases (e.g. one per level) accumulate
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            phase = self.__phases.setdefault(name, {"wall": 0.0, "cpu": 0.0, "calls": 0})
+            phase["wall"] += time.perf_counter() - wall_start
+            phase["cpu"] += time.process_time() - cpu_start
+            phase["calls"] += 1
+
+    def add_level(self, **counts):
+        self.__levels.append(counts)
+
+    def count(self, name: str, n: int = 1):
+        self.__counters[name] = self.__counters.get(name, 0) + n
+
+    def set(self, name: str, value):
+        self.__values[name] = value
+
+    def timings(self) -> dict:
+        return {name: phase["wall"] for name, phase in self.__phases.items()}
+
+    def start(self):
+        if self.__profile_path != None:
+            self.__profiler = cProfile.Profile()
+            self.__profiler.enable()
+        if self.__trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self):
+        if self.__profiler != None:
+            self.__profiler.disable()
+            self.__profiler.dump_stats(self.__profile_path)
+            # The hottest functions are kept in the stats as well
+            summary = io.StringIO()
+            pstats.Stats(self.__profiler, stream = summary).sort_stats("cumulative").print_stats(15)
+            self.__values["profile"] = {"path": self.__profile_path, "top_cumulative": summary.getvalue()}
+            self.__profiler = None
+        if self.__trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:10]
+            self.__values["traced_memory"] = {
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "top_allocations": [{"location": str(stat.traceback), "bytes": stat.size, "count": stat.count} for stat in top]
+            }
+            tracemalloc.stop()
+        self.__values["peak_rss_kb"] = peak_rss_kb()
+
+    def to_dict(self) -> dict:
+        return {
+            "phases": {name: dict(phase) for name, phase in self.__phases.items()},
+            "levels": list(self.__levels),
+            "counters": dict(self.__counters),
+            **self.__values
+        }
+
+    def to_json(self, path: str = None) -> str:
+        text = json.dumps(self.to_dict(), indent = 4, default = str)
+        if path != None:
+            with open(path, "w") as file:
+                file.write(text)
+        return text
+
+def peak_rss_kb():
+    # Peak resident set size of the whole process so far, None where the resource module is missing
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak // 1024 if platform.system() == "Darwin" else peak
\ No newline at end of file
@@ -0,0 +1,107 @@
+from concurrent.futures import ProcessPoolExecutor
+import math
+import numpy as np
+
+from data_processing.association_rules import AssociationRuleGenerator
+from data_processing.item_bitmaps import build_item_bitmaps, popcount
+from data_processing.mining_progress import MiningProgress
+from data_processing.transaction_database import TransactionDatabase
+
+class SON:
+    def __init__(self, min_sup: int = None, min_conf: float = None, workers: int = 2, engine_class = None, engine_parameters: dict = {}, progress: MiningProgress = None):
+        self.__min_sup = min_sup
+        self.__min_conf = min_conf
+        self.__workers = workers
+        self.__progress = progress # reported between the phases only, it cannot reach the workers
+
+        # Serial engine (Apriori, FPGrowth or Eclat) used to mine every partition locally
+        self.__engine_class = engine_class
+        self.__engine_parameters = engine_parameters
+
+        self.__supports = {} # sorted tuple of item ids -> support, for every frequent itemset
+        self.__n_transactions = 0
+
+    def run(self, database: TransactionDatabase):
+        supports = self.mine_frequent_sets(database)
+
+        rule_generator = AssociationRuleGenerator(min_conf = self.__min_conf)
+        return rule_generator.run(supports, self.__n_transactions, database.item_names)
+
+    def mine_frequent_sets(self, database: TransactionDatabase) -> dict:
+        self.__n_transactions = database.n_transactions()
+        self.__supports = {}
+        if self.__n_transactions == 0:
+            return self.__supports
+
+        partitions = self.__partition(database)
+        with ProcessPoolExecutor(max_workers = self.__workers) as executor:
+            # Phase 1: an itemset frequent in the whole database is frequent in at least one
+            # partition at the proportionally scaled threshold, so the union of the local
+            # results contains every globally frequent itemset. Supports are integers, so an
+            # itemset below ceil(min_sup * n_p / n) in every partition is below min_sup overall.
+            print(f"[INFO] SON phase 1: mining {len(partitions)} partitions locally with {self.__workers} workers.")
+            local_min_sups = [max(1, math.ceil(self.__min_sup * partition.n_transactions() / self.__n_transactions)) for partition in partitions]
+            local_results = executor.map(
+                mine_partition,
+                [self.__engine_class] * len(partitions),
+                [self.__engine_parameters] * len(partitions),
+                partitions,
+                local_min_sups
+            )
+            candidates = set()
+            for local_supports in local_results:
+                candidates.update(local_supports)
+            candidates = sorted(candidates)
+            print(f"    |---- Done. {len(candidates)} candidates.")
+            if self.__progress != None:
+                self.__progress.update("frequent sets", phase = 1, candidates = len(candidates))
+
+            # Phase 2: one global pass counting the exact support of every candidate
+            print(f"[INFO] SON phase 2: counting candidates globally.")
+            counts = np.zeros(len(candidates), dtype = np.int64)
+            for partition_counts in executor.map(count_partition, partitions, [candidates] * len(partitions)):
+                counts += partition_counts
+
+        for candidate, count in zip(candidates, counts.tolist()):
+            if count >= self.__min_sup:
+                self.__supports[candidate] = count
+        print(f"    |---- Done. Found {len(self.__supports)} frequent sets.")
+        if self.__progress != None:
+            self.__progress.update("frequent sets", phase = 2, frequent = len(self.__supports))
+
+        return self.__supports
+
+    def __partition(self, database: TransactionDatabase) -> list:
+        n_partitions = min(self.__workers, len(database))
+        bounds = np.linspace(0, len(database), n_partitions + 1).astype(int).tolist()
+        return [database.partition(bounds[i], bounds[i + 1]) for i in range(n_partitions)]
+
+# Worker entry points have to be module-level functions so they can be pickled
+
+def mine_partition(engine_class, engine_parameters: dict, partition: TransactionDatabase, local_min_sup: int) -> dict:
+    engine = engine_class(min_sup = local_min_sup, **engine_parameters)
+    return engine.mine_frequent_sets(partition)
+
+def count_partition(partition: TransactionDatabase, candidates: list) -> np.ndarray:
+    # Candidates are sorted and closed under prefixes, so walking them depth-first lets every
+    # candidate reuse the bitmap of its prefix and cost a single AND
+    items = {item for candidate in candidates for item in candidate}
+    item_bitmaps = build_item_bitmaps(partition, items)
+
+    counts = np.zeros(len(candidates), dtype = np.int64)
+    stack = [] # [(itemset, bitmap)] along the current branch
+    for i, candidate in enumerate(candidates):
+        while len(stack) > 0 and stack[-1][0] != candidate[:len(stack[-1][0])]:
+            stack.pop()
+
+        if len(stack) > 0 and len(stack[-1][0]) == len(candidate) - 1:
+            bitmap = stack[-1][1] & item_bitmaps.get(candidate[-1], 0)
+        else:
+            bitmap = item_bitmaps.get(candidate[0], 0)
+            for item in candidate[1:]:
+                bitmap &= item_bitmaps.get(item, 0)
+
+        counts[i] = popcount(bitmap)
+        stack.append((candidate, bitmap))
+
+    return counts
\ No newline at end of file
@@ -0,0 +1,132 @@
+from itertools import islice
+import numpy as np
+import pandas as pd
+
+from data_processing.transaction_database import TransactionStoreWriter
+
+class StreamingIngestor:
+    def __init__(self, chunk_size: int = 100000):
+        self.__chunk_size = chunk_size
+
+        # Item dictionary grown while the chunks are read: token -> id and id -> token
+        self.__item_ids = {}
+        self.__item_names = []
+
+        # Column -> dtype of the whole file, every chunk of a fixed-length CSV is cast to it
+        self.__dtypes = {}
+
+    def ingest(self, filepath: str, store_path: str, min_sup: int = 0, fixed_length = True, ommit_first_column = False, metadata: dict = {}):
+        self.__item_ids = {}
+        self.__item_names = []
+        self.__dtypes = {}
+
+        # pandas infers the types of every chunk on its own, so a column read as int in one chunk
+        # may be float in the next (e.g. once values are missing) and the same value would become
+        # two items. The types of the whole file are settled first, as the in-memory loader sees them.
+        if fixed_length == True:
+            print(f"[INFO] Streaming pass 0: reading column types in chunks of {self.__chunk_size} rows.")
+            self.__dtypes = self.__csv_column_dtypes(filepath, ommit_first_column)
+            print(f"    |---- Done. {len(self.__dtypes)} columns.")
+
+        # First pass: build the item dictionary and count supports of single items
+        print(f"[INFO] Streaming pass 1: counting item supports in chunks of {self.__chunk_size} rows.")
+        supports = np.zeros(0, dtype = np.int64)
+        n_transactions = 0
+        for indptr, indices in self.__encoded_chunks(filepath, fixed_length, ommit_first_column):
+            chunk_supports = np.bincount(indices, minlength = len(self.__item_names))
+            chunk_supports[:len(supports)] += supports
+            supports = chunk_supports
+            n_transactions += len(indptr) - 1
+        print(f"    |---- Done. {n_transactions} transactions, {len(self.__item_names)} unique items.")
+
+        # Items below min_sup can never be part of a frequent set, so they are dropped from the store
+        frequent_items = np.flatnonzero(supports >= min_sup)
+        remap = np.full(len(self.__item_names), -1, dtype = np.int64)
+        remap[frequent_items] = np.arange(len(frequent_items))
+
+        # Second pass: write transactions reduced to their frequent items into the binary store
+        print(f"[INFO] Streaming pass 2: writing {len(frequent_items)} frequent items to '{store_path}'.")
+        writer = TransactionStoreWriter(store_path)
+        for indptr, indices in self.__encoded_chunks(filepath, fixed_length, ommit_first_column):
+            n_rows = len(indptr) - 1
+            row_ids = np.repeat(np.arange(n_rows, dtype = np.int64), np.diff(indptr))
+            new_ids = remap[indices]
+            kept = new_ids >= 0
+            row_ids = row_ids[kept]
+            new_ids = new_ids[kept]
+            order = np.lexsort((new_ids, row_ids))
+            writer.append(np.bincount(row_ids, minlength = n_rows), new_ids[order])
+
+        metadata = dict(metadata)
+        metadata["min_item_support"] = min_sup
+        database = writer.close([self.__item_names[i] for i in frequent_items], metadata)
+        print(f"    |---- Done.")
+
+        return database
+
+    def __encoded_chunks(self, filepath: str, fixed_length = True, ommit_first_column = False):
+        if fixed_length == True:
+            return self.__encoded_csv_fixed_chunks(filepath, ommit_first_column)
+        return self.__encoded_csv_non_fixed_chunks(filepath)
+
+    def __encode_token(self, token: str) -> int:
+        item_id = self.__item_ids.get(token)
+        if item_id is None:
+            item_id = len(self.__item_names)
+            self.__item_ids[token] = item_id
+            self.__item_names.append(token)
+        return item_id
+
+    def __encoded_csv_non_fixed_chunks(self, filepath: str):
+        with open(filepath, "r") as file:
+            while True:
+                lines = list(islice(file, self.__chunk_size))
+                if len(lines) == 0:
+                    break
+
+                indptr = [0]
+                indices = []
+                for line in lines:
+                    indices.extend(sorted({self.__encode_token(item.strip()) for item in line.split(",")}))
+                    indptr.append(len(indices))
+                yield np.array(indptr, dtype = np.int64), np.array(indices, dtype = np.int64)
+
+    def __csv_fixed_chunks(self, filepath: str, ommit_first_column = False):
+        usecols = None
+        if ommit_first_column == True:
+            usecols = pd.read_csv(filepath, nrows = 0).columns[1:]
+        return pd.read_csv(filepath, usecols = usecols, chunksize = self.__chunk_size)
+
+    def __csv_column_dtypes(self, filepath: str, ommit_first_column = False) -> dict:
+        chunk_dtypes = {}
+        for df in self.__csv_fixed_chunks(filepath, ommit_first_column):
+            for col in df.columns:
+                chunk_dtypes.setdefault(col, set()).add(df[col].dtype)
+        return {col: common_dtype(dtypes) for col, dtypes in chunk_dtypes.items()}
+
+    def __encoded_csv_fixed_chunks(self, filepath: str, ommit_first_column = False):
+        for df in self.__csv_fixed_chunks(filepath, ommit_first_column):
+            # Factorize the chunk column-wise and translate the local codes into global item ids
+            ids = np.empty((len(df), len(df.columns)), dtype = np.int64)
+            for j, col in enumerate(df.columns):
+                column = df[col]
+                if col in self.__dtypes and column.dtype != self.__dtypes[col]:
+                    column = column.astype(self.__dtypes[col])
+                codes, uniques = pd.factorize(column, use_na_sentinel = True)
+                global_ids = np.array([self.__encode_token(f"{col}={value}") for value in uniques] + [-1], dtype = np.int64)
+                ids[:, j] = global_ids[codes]
+
+            present = ids >= 0
+            indptr = np.zeros(len(df) + 1, dtype = np.int64)
+            np.cumsum(present.sum(axis = 1), out = indptr[1:])
+            yield indptr, ids[present]
+
+def common_dtype(dtypes: set):
+    # The dtype pandas gives a column whose chunks were read as dtypes when it reads the file
+    # at once: numeric chunks are promoted (int and float give float), anything else is mixed
+    # and kept as Python objects
+    if len(dtypes) == 1:
+        return next(iter(dtypes))
+    if all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) for dtype in dtypes):
+        return np.result_type(*dtypes)
+    return np.dtype(object)
\ No newline at end of file
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+import sys
+
+# Rough per-entry cost of an OrderedDict slot (hash table entry, linked list node and the
+# support int) on top of the key tuple itself
+ENTRY_OVERHEAD_BYTES = 120
+
+class SupportCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        # Keys are canonical itemsets (sorted tuples of item ids), values absolute supports.
+        # Entries are kept in least-recently-used order and evicted once max_bytes is exceeded.
+        self.__max_bytes = max_bytes
+        self.__entries = OrderedDict()
+        self.__bytes = 0
+
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get(self, itemset: tuple):
+        sup = self.__entries.get(itemset)
+        if sup is None:
+            self.__misses += 1
+            return None
+        self.__entries.move_to_end(itemset)
+        self.__hits += 1
+        return sup
+
+    def put(self, itemset: tuple, sup: int):
+        if itemset in self.__entries:
+            self.__entries[itemset] = sup
+            self.__entries.move_to_end(itemset)
+            return
+
+        self.__entries[itemset] = sup
+        self.__bytes += self.__entry_bytes(itemset)
+        while self.__bytes > self.__max_bytes and len(self.__entries) > 0:
+            evicted, _ = self.__entries.popitem(last = False)
+            self.__bytes -= self.__entry_bytes(evicted)
+            self.__evictions += 1
+
+    def clear(self):
+        self.__entries.clear()
+        self.__bytes = 0
+
+    def __contains__(self, itemset: tuple):
+        return itemset in self.__entries
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def stats(self) -> dict:
+        lookups = self.__hits + self.__misses
+        return {
+            "entries": len(self.__entries),
+            "bytes": self.__bytes,
+            "max_bytes": self.__max_bytes,
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "evictions": self.__evictions,
+            "hit_rate": self.__hits / lookups if lookups > 0 else 0.0
+        }
+
+    def __entry_bytes(self, itemset: tuple) -> int:
+        return sys.getsizeof(itemset) + ENTRY_OVERHEAD_BYTES
\ No newline at end of file
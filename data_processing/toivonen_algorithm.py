@@ -0,0 +1,173 @@
+import math
+import numpy as np
+
+from data_processing.apriori_algorithm import generate_candidates
+from data_processing.association_rules import AssociationRuleGenerator
+from data_processing.mining_progress import MiningProgress
+from data_processing.run_stats import RunStats
+from data_processing.son_algorithm import count_partition
+from data_processing.transaction_database import TransactionDatabase
+
+# The sample threshold is never lowered below this fraction of min_sup, as mining a small sample
+# at a tiny threshold explodes; the probability of missing a frequent set grows instead
+MIN_LOWERED_THRESHOLD = 0.5
+
+class Toivonen:
+    def __init__(self, min_sup: int = None, min_conf: float = None, mode: str = "exact", sample_fraction: float = 0.1, delta: float = 0.01,
+                 seed: int = None, engine_class = None, engine_parameters: dict = {}, progress: MiningProgress = None, stats: RunStats = None):
+        # Sampling-based mining (Toivonen, 1996). In "exact" mode a random sample is mined at a
+        # threshold lowered so that a globally frequent itemset is missed with probability at
+        # most delta, then the sample's frequent sets and their negative border are counted in
+        # one pass over the whole database. If no border set turns out frequent the result is
+        # exact; otherwise further passes count the border of the grown collection until it is.
+        # "approximate" mode skips the full pass and scales the sample supports, which are then
+        # within error_bound (a fraction of the transactions) of the true ones with probability
+        # 1 - delta per itemset.
+        self.__min_sup = min_sup
+        self.__min_conf = min_conf
+        self.__mode = mode
+        self.__sample_fraction = sample_fraction
+        self.__delta = delta
+        self.__seed = seed
+        self.__progress = progress
+        self.__stats = RunStats() if stats == None else stats
+
+        # Serial engine (Apriori, FPGrowth or Eclat) used to mine the sample
+        self.__engine_class = engine_class
+        self.__engine_parameters = engine_parameters
+
+        self.__supports = {} # sorted tuple of item ids -> support, for every frequent itemset
+        self.__n_transactions = 0
+        self.__report = {}
+
+    def run(self, database: TransactionDatabase):
+        supports = self.mine_frequent_sets(database)
+
+        rule_generator = AssociationRuleGenerator(min_conf = self.__min_conf, stats = self.__stats)
+        return rule_generator.run(supports, self.__n_transactions, database.item_names)
+
+    def report(self) -> dict:
+        return dict(self.__report)
+
+    def mine_frequent_sets(self, database: TransactionDatabase) -> dict:
+        self.__n_transactions = database.n_transactions()
+        self.__supports = {}
+        self.__report = {"mode": self.__mode}
+        if self.__n_transactions == 0:
+            return self.__supports
+
+        with self.__stats.phase("sampling"):
+            sample = self.__sample(database)
+        n_sample = sample.n_transactions()
+        fraction = self.__min_sup / self.__n_transactions
+        if self.__mode == "approximate":
+            sample_min_sup = max(1, math.ceil(fraction * n_sample))
+            error_bound = math.sqrt(math.log(2 / self.__delta) / (2 * n_sample))
+        else:
+            # Hoeffding: an itemset of support fraction >= min_sup / n falls below the lowered
+            # threshold in the sample with probability at most delta
+            error_bound = math.sqrt(math.log(1 / self.__delta) / (2 * n_sample))
+            lowered = max(fraction - error_bound, fraction * MIN_LOWERED_THRESHOLD)
+            if lowered > fraction - error_bound:
+                error_bound = fraction - lowered
+                print(f"[WARNING] The sample is too small for delta {self.__delta:g}, its threshold is only lowered to " + \
+                      f"{MIN_LOWERED_THRESHOLD:g} min_sup; a second pass becomes more likely.")
+            sample_min_sup = max(1, math.floor(lowered * n_sample))
+        self.__report.update(sample_size = n_sample, sample_min_sup = sample_min_sup, delta = self.__delta, error_bound = error_bound)
+        if self.__mode == "exact":
+            # Bound on the probability that a given frequent set is missed by the sample
+            self.__report["miss_probability"] = min(1.0, math.exp(-2 * n_sample * error_bound ** 2))
+
+        print(f"[INFO] Mining a sample of {n_sample} of {self.__n_transactions} transactions at min_sup {sample_min_sup}.")
+        with self.__stats.phase("sample_mining"):
+            engine = self.__engine_class(min_sup = sample_min_sup, progress = self.__progress, **self.__engine_parameters)
+            sample_supports = engine.mine_frequent_sets(sample)
+        print(f"    |---- Done. {len(sample_supports)} frequent sets in the sample.")
+        if self.__progress != None:
+            self.__progress.update("frequent sets", phase = 1, candidates = len(sample_supports))
+
+        if self.__mode == "approximate":
+            # Supports are scaled to the whole database; no set is verified
+            scale = self.__n_transactions / n_sample
+            self.__supports = {itemset: round(sup * scale) for itemset, sup in sample_supports.items()}
+            self.__report.update(passes = 0, exact = False)
+            print(f"[INFO] Approximate supports are within {error_bound * self.__n_transactions:.1f} transactions of the true ones " + \
+                  f"with probability {1 - self.__delta:g} per itemset.")
+            return self.__supports
+
+        with self.__stats.phase("verification"):
+            self.__verify(database, set(sample_supports))
+        return self.__supports
+
+    def __sample(self, database: TransactionDatabase) -> TransactionDatabase:
+        n_sample = min(self.__n_transactions, max(1, round(self.__sample_fraction * self.__n_transactions)))
+        rng = np.random.default_rng(self.__seed)
+        transaction_ids = np.sort(rng.choice(self.__n_transactions, size = n_sample, replace = False))
+        if database.weights is None:
+            return database.take(transaction_ids)
+
+        # Transactions of a deduplicated database are sampled, not its rows: the rows the drawn
+        # transactions fall into are taken, weighted by how many of them were drawn
+        row_ids, counts = np.unique(np.searchsorted(np.cumsum(database.weights), transaction_ids, side = "right"), return_counts = True)
+        sample = database.take(row_ids)
+        sample.weights = counts.astype(np.int64)
+        return sample
+
+    def __verify(self, database: TransactionDatabase, sample_sets: set):
+        # First pass: the sample's frequent sets and their negative border
+        border = negative_border(sample_sets, database.n_items())
+        counted = {}
+        self.__count(database, sorted(sample_sets.union(border)), counted)
+        frequent = {itemset for itemset, sup in counted.items() if sup >= self.__min_sup}
+        border_frequent = sum(1 for itemset in border if itemset in frequent)
+        print(f"    |---- Pass 1: {len(sample_sets)} candidates and {len(border)} negative border sets counted, " + \
+              f"{len(frequent)} frequent, {border_frequent} of them in the border.")
+        self.__report.update(candidates = len(sample_sets), negative_border = len(border), border_frequent = border_frequent)
+        if self.__progress != None:
+            self.__progress.update("frequent sets", phase = 2, verification_pass = 1, frequent = len(frequent))
+
+        # A frequent border set may have frequent supersets the sample missed. The border of
+        # the frequent sets found so far is counted until none of it is frequent, at which
+        # point every frequent set has been counted.
+        passes = 1
+        while True:
+            uncounted = [itemset for itemset in negative_border(frequent, database.n_items()) if itemset not in counted]
+            if len(uncounted) == 0:
+                break
+            passes += 1
+            self.__count(database, sorted(uncounted), counted)
+            new_frequent = [itemset for itemset in uncounted if counted[itemset] >= self.__min_sup]
+            print(f"    |---- Pass {passes}: {len(uncounted)} border sets counted, {len(new_frequent)} frequent.")
+            if self.__progress != None:
+                self.__progress.update("frequent sets", phase = 2, verification_pass = passes, frequent = len(frequent) + len(new_frequent))
+            if len(new_frequent) == 0:
+                break
+            frequent.update(new_frequent)
+
+        self.__supports = {itemset: counted[itemset] for itemset in frequent}
+        self.__report.update(passes = passes, exact = True, exact_after_first_pass = border_frequent == 0)
+        self.__stats.count("verification_passes", passes)
+        if border_frequent == 0:
+            print(f"[INFO] No negative border set is frequent: the sampled result is exact.")
+        else:
+            print(f"[INFO] The sample missed frequent sets, {passes} passes were needed for an exact result.")
+        print(f"    |---- Done. Found {len(self.__supports)} frequent sets.")
+
+    def __count(self, database: TransactionDatabase, candidates: list, counted: dict, block_size: int = 262144):
+        # One sequential pass, counting the candidates block by block
+        counts = np.zeros(len(candidates), dtype = np.int64)
+        for start in range(0, len(database), block_size):
+            counts += count_partition(database.partition(start, min(start + block_size, len(database))), candidates)
+        counted.update(zip(candidates, counts.tolist()))
+
+def negative_border(itemsets: set, n_items: int) -> list:
+    # Minimal itemsets not in the downward closed collection itemsets: the missing single
+    # items and the candidates joined from its k-sets that are not in it themselves
+    border = [(item,) for item in range(n_items) if (item,) not in itemsets]
+    levels = {}
+    for itemset in itemsets:
+        levels.setdefault(len(itemset), []).append(itemset)
+    for k in sorted(levels):
+        candidates, n_generated, n_pruned = generate_candidates(sorted(levels[k]))
+        border.extend(candidate for candidate, parent1, parent2 in candidates if candidate not in itemsets)
+    return border
@@ -0,0 +1,291 @@
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+STORE_MAGIC = b"APRTDB01"
+
+class TransactionDatabase:
+    def __init__(self, item_names: list = [], indptr: np.ndarray = None, indices: np.ndarray = None, metadata: dict = None,
+                 weights: np.ndarray = None):
+        # Item dictionary: item id -> original "col=value" token
+        self.item_names = item_names
+
+        # CSR layout: items of transaction t are indices[indptr[t]:indptr[t + 1]],
+        # stored as dense integer ids sorted in ascending order. Both arrays may be
+        # memory-mapped views of an on-disk store (see TransactionStoreWriter)
+        self.indptr = np.zeros(1, dtype = np.int64) if indptr is None else indptr
+        self.indices = np.zeros(0, dtype = np.int32) if indices is None else indices
+
+        # Free-form information recorded in the store header (source file, options, ...)
+        self.metadata = {} if metadata is None else metadata
+
+        # Multiplicity of every row once identical transactions are collapsed (see deduplicate),
+        # None if every row is a single transaction
+        self.weights = weights
+
+    @classmethod
+    def from_token_rows(cls, token_rows):
+        # Encode every token to an integer id once, while the rows are read
+        item_ids = {}
+        item_names = []
+        indptr = [0]
+        indices = []
+        for tokens in token_rows:
+            row = set()
+            for token in tokens:
+                item_id = item_ids.get(token)
+                if item_id is None:
+                    item_id = len(item_names)
+                    item_ids[token] = item_id
+                    item_names.append(token)
+                row.add(item_id)
+            indices.extend(sorted(row))
+            indptr.append(len(indices))
+
+        return cls(
+            item_names,
+            np.array(indptr, dtype = np.int64),
+            np.array(indices, dtype = np.int32)
+        )
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame):
+        # Factorize every column into item codes, so column j contributes the item
+        # "col=value" with id offsets[j] + code to each row where it is not missing.
+        # Ids grow with the column index, hence the items of a row stay sorted.
+        item_names = []
+        offsets = np.zeros(len(df.columns), dtype = np.int64)
+        codes = np.empty((len(df), len(df.columns)), dtype = np.int64)
+        for j, col in enumerate(df.columns):
+            col_codes, uniques = pd.factorize(df[col], use_na_sentinel = True)
+            offsets[j] = len(item_names)
+            codes[:, j] = col_codes
+            item_names.extend(f"{col}={value}" for value in uniques)
+
+        present = codes >= 0
+        indices = (codes + offsets)[present].astype(np.int32)
+        indptr = np.zeros(len(df) + 1, dtype = np.int64)
+        np.cumsum(present.sum(axis = 1), out = indptr[1:])
+
+        return cls(item_names, indptr, indices)
+
+    @classmethod
+    def open(cls, path: str):
+        # Layout: magic | uint64 header length | JSON header | padding to 8 bytes | indptr (int64) | indices (int32)
+        with open(path, "rb") as file:
+            if file.read(len(STORE_MAGIC)) != STORE_MAGIC:
+                raise ValueError(f"'{path}' is not a transaction store.")
+            header_length = int(np.frombuffer(file.read(8), dtype = np.uint64)[0])
+            header = json.loads(file.read(header_length).decode("utf-8"))
+
+        indptr_offset = store_data_offset(header_length)
+        indices_offset = indptr_offset + 8 * (header["n_transactions"] + 1)
+        indptr = np.memmap(path, dtype = np.int64, mode = "r", offset = indptr_offset, shape = (header["n_transactions"] + 1,))
+        if header["n_indices"] > 0:
+            indices = np.memmap(path, dtype = np.int32, mode = "r", offset = indices_offset, shape = (header["n_indices"],))
+        else:
+            indices = np.zeros(0, dtype = np.int32)
+
+        return cls(header["item_names"], indptr, indices, header["metadata"])
+
+    def save(self, path: str, metadata: dict = None):
+        if self.weights is not None:
+            raise ValueError("Deduplicated transactions cannot be saved to a store.")
+        writer = TransactionStoreWriter(path)
+        for start, indptr, indices in self.chunks():
+            writer.append(np.diff(indptr), indices)
+        return writer.close(self.item_names, self.metadata if metadata is None else metadata)
+
+    def partition(self, start: int, end: int):
+        # In-memory copy of transactions [start, end), sharing the item dictionary
+        indptr = np.array(self.indptr[start:end + 1], dtype = np.int64)
+        indices = np.array(self.indices[indptr[0]:indptr[-1]], dtype = np.int32)
+        weights = None if self.weights is None else self.weights[start:end].copy()
+        return TransactionDatabase(self.item_names, indptr - indptr[0], indices, weights = weights)
+
+    def take(self, row_ids: np.ndarray):
+        # In-memory copy of the transactions row_ids (ascending), sharing the item dictionary
+        row_ids = np.asarray(row_ids, dtype = np.int64)
+        starts = np.asarray(self.indptr[row_ids], dtype = np.int64)
+        lengths = np.asarray(self.indptr[row_ids + 1], dtype = np.int64) - starts
+        indptr = np.zeros(len(row_ids) + 1, dtype = np.int64)
+        np.cumsum(lengths, out = indptr[1:])
+        positions = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1], dtype = np.int64)
+        indices = np.array(self.indices[positions], dtype = np.int32)
+        weights = None if self.weights is None else self.weights[row_ids]
+        return TransactionDatabase(self.item_names, indptr, indices, weights = weights)
+
+    def concatenate(self, other):
+        # New in-memory database holding the transactions of self followed by those of other;
+        # items of other missing from the dictionary are appended to it
+        item_ids = {name: i for i, name in enumerate(self.item_names)}
+        item_names = list(self.item_names)
+        remap = np.empty(other.n_items(), dtype = np.int32)
+        for i, name in enumerate(other.item_names):
+            if name not in item_ids:
+                item_ids[name] = len(item_names)
+                item_names.append(name)
+            remap[i] = item_ids[name]
+
+        other_indptr = np.asarray(other.indptr, dtype = np.int64)
+        other_indices = remap[np.asarray(other.indices)]
+        # Remapping may break the ascending order of the items within a row, so re-sort them
+        row_ids = np.repeat(np.arange(len(other), dtype = np.int64), np.diff(other_indptr))
+        other_indices = other_indices[np.lexsort((other_indices, row_ids))]
+
+        indptr = np.concatenate((np.asarray(self.indptr, dtype = np.int64), self.indptr[-1] + other_indptr[1:]))
+        indices = np.concatenate((np.asarray(self.indices, dtype = np.int32), other_indices.astype(np.int32)))
+        weights = None
+        if self.weights is not None or other.weights is not None:
+            weights = np.concatenate((self.row_weights(), other.row_weights()))
+        return TransactionDatabase(item_names, indptr, indices, weights = weights)
+
+    def deduplicate(self, min_item_support: int = 0):
+        # New in-memory database with identical transactions collapsed into one row weighted by
+        # their multiplicity. Items with support below min_item_support are dropped first, so
+        # rows differing only in such items merge as well. Rows left empty are merged too but
+        # kept, hence the number of transactions does not change.
+        keep = self.item_supports() >= min_item_support
+        weights = self.row_weights()
+        indices = np.asarray(self.indices, dtype = np.int32)
+        selected = keep[indices]
+        row_of_index = np.repeat(np.arange(len(self), dtype = np.int64), np.diff(self.indptr))
+        lengths = np.bincount(row_of_index[selected], minlength = len(self))
+        del row_of_index
+        indptr = np.zeros(len(self) + 1, dtype = np.int64)
+        np.cumsum(lengths, out = indptr[1:])
+        reduced = TransactionDatabase(self.item_names, indptr, indices[selected])
+
+        # Rows of equal length are compared as the rows of one matrix. Every group of identical
+        # rows is kept as its first row, weighted by the sum of their weights.
+        first_rows = []
+        unique_weights = []
+        for length in np.unique(lengths).tolist():
+            row_ids = np.flatnonzero(lengths == length)
+            if length == 0:
+                first = np.zeros(1, dtype = np.int64)
+                inverse = np.zeros(len(row_ids), dtype = np.int64)
+            else:
+                first, inverse = unique_rows(reduced.indices[indptr[row_ids][:, None] + np.arange(length)])
+            first_rows.append(row_ids[first])
+            unique_weights.append(np.bincount(inverse, weights = weights[row_ids], minlength = len(first)).astype(np.int64))
+
+        # Unique rows keep the order of their first occurrence
+        first_rows = np.concatenate(first_rows) if len(first_rows) > 0 else np.zeros(0, dtype = np.int64)
+        unique_weights = np.concatenate(unique_weights) if len(unique_weights) > 0 else np.zeros(0, dtype = np.int64)
+        order = np.argsort(first_rows, kind = "stable")
+        deduplicated = reduced.take(first_rows[order])
+        deduplicated.weights = unique_weights[order]
+
+        # Like streaming stores, a reduced database records the support its items are known to reach
+        deduplicated.metadata = dict(self.metadata)
+        if min_item_support > deduplicated.metadata.get("min_item_support", 0):
+            deduplicated.metadata["min_item_support"] = min_item_support
+        return deduplicated
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def n_items(self) -> int:
+        return len(self.item_names)
+
+    def n_transactions(self) -> int:
+        # len() counts the stored rows, this the transactions they stand for
+        return len(self) if self.weights is None else int(self.weights.sum())
+
+    def row_weights(self) -> np.ndarray:
+        return np.ones(len(self), dtype = np.int64) if self.weights is None else np.asarray(self.weights, dtype = np.int64)
+
+    def chunks(self, chunk_size: int = 65536):
+        # Sequential pass over the database: yields (first transaction id, indptr, indices)
+        # with indptr rebased to the chunk, so at most chunk_size rows are in memory at once
+        for start in range(0, len(self), chunk_size):
+            end = min(start + chunk_size, len(self))
+            indptr = np.array(self.indptr[start:end + 1], dtype = np.int64)
+            indices = np.array(self.indices[indptr[0]:indptr[-1]], dtype = np.int32)
+            yield start, indptr - indptr[0], indices
+
+    def rows(self):
+        for start, indptr, indices in self.chunks():
+            indptr = indptr.tolist()
+            indices = indices.tolist()
+            for t in range(len(indptr) - 1):
+                yield indices[indptr[t]:indptr[t + 1]]
+
+    def weighted_rows(self):
+        # Yields (row, weight) pairs; rows are read chunk by chunk as by rows()
+        if self.weights is None:
+            return ((row, 1) for row in self.rows())
+        return zip(self.rows(), self.weights.tolist())
+
+    def item_supports(self) -> np.ndarray:
+        supports = np.zeros(self.n_items(), dtype = np.int64)
+        for start, indptr, indices in self.chunks():
+            if self.weights is None:
+                supports += np.bincount(indices, minlength = self.n_items())
+            else:
+                index_weights = np.repeat(self.weights[start:start + len(indptr) - 1], np.diff(indptr))
+                supports += np.bincount(indices, weights = index_weights, minlength = self.n_items()).astype(np.int64)
+        return supports
+
+class TransactionStoreWriter:
+    def __init__(self, path: str):
+        # Offsets and item ids are appended to two temporary files while the
+        # transactions arrive and concatenated into the final store on close
+        self.__path = path
+        self.__indptr_file = open(path + ".indptr.tmp", "wb")
+        self.__indices_file = open(path + ".indices.tmp", "wb")
+        self.__n_transactions = 0
+        self.__n_indices = 0
+
+        self.__indptr_file.write(np.zeros(1, dtype = np.int64).tobytes())
+
+    def append(self, lengths: np.ndarray, indices: np.ndarray):
+        offsets = self.__n_indices + np.cumsum(lengths, dtype = np.int64)
+        self.__indptr_file.write(offsets.tobytes())
+        self.__indices_file.write(np.asarray(indices, dtype = np.int32).tobytes())
+        self.__n_transactions += len(lengths)
+        self.__n_indices += int(np.sum(lengths))
+
+    def close(self, item_names: list, metadata: dict = {}) -> TransactionDatabase:
+        self.__indptr_file.close()
+        self.__indices_file.close()
+
+        header = json.dumps({
+            "n_transactions": self.__n_transactions,
+            "n_indices": self.__n_indices,
+            "item_names": list(item_names),
+            "metadata": metadata
+        }).encode("utf-8")
+
+        # The store is assembled under a temporary name and moved into place at the end, so
+        # memory maps of a previous version of the store are never truncated underneath
+        with open(self.__path + ".tmp", "wb") as file:
+            file.write(STORE_MAGIC)
+            file.write(np.array([len(header)], dtype = np.uint64).tobytes())
+            file.write(header)
+            file.write(b"\0" * (store_data_offset(len(header)) - len(STORE_MAGIC) - 8 - len(header)))
+            for tmp_path in (self.__path + ".indptr.tmp", self.__path + ".indices.tmp"):
+                with open(tmp_path, "rb") as tmp_file:
+                    shutil.copyfileobj(tmp_file, file)
+                os.remove(tmp_path)
+        os.replace(self.__path + ".tmp", self.__path)
+
+        return TransactionDatabase.open(self.__path)
+
+def unique_rows(rows: np.ndarray) -> tuple:
+    # (first occurrence of every distinct row, index of its distinct row for every row) of a 2-D
+    # int array. Rows are grouped by a 64-bit hash of their values, which sorts much faster than
+    # the rows themselves; only if distinct rows share a hash are the rows compared bytewise.
+    multipliers = np.random.default_rng(0).integers(1, 2 ** 63, size = rows.shape[1], dtype = np.uint64) | np.uint64(1)
+    hashes = (rows.astype(np.uint64) * multipliers).sum(axis = 1, dtype = np.uint64)
+    _, first, inverse = np.unique(hashes, return_index = True, return_inverse = True)
+    if not np.array_equal(rows[first][inverse], rows):
+        _, first, inverse = np.unique(rows, axis = 0, return_index = True, return_inverse = True)
+    return first, inverse.reshape(-1)
+
+def store_data_offset(header_length: int) -> int:
+    offset = len(STORE_MAGIC) + 8 + header_length
+    return (offset + 7) // 8 * 8
\ No newline at end of file
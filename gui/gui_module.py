@@ -1,9 +1,13 @@
 import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import filedialog
-import json
 
 from data_processing.apriori_data_processor import AprioriDataProcessor
+from data_processing.mining_progress import MiningProgress
+from data_processing.rule_table import RuleTable
+from gui.rule_table_view import RuleTableView
 
 class GUIModule:
     def __init__(self):
@@ -31,18 +35,27 @@ class GUIModule:
         self.__min_conf_entry = None
 
         self.__run_button = None
+        self.__cancel_button = None
         self.__exit_button = None
         self.__show_plots_button = None
-        self.__save_to_json_button = None
+        self.__save_rules_button = None
 
         self.__rule_display = None
+        self.__progress_label = None
 
         self.__min_sup_text = tk.StringVar(value = "50")
         self.__min_conf_text = tk.StringVar(value = "0.5")
 
         self.__supported_datafiles = {"csv", "arff"}
 
-        self.__rule_data = []
+        self.__rules = RuleTable()
+
+        # Mining runs on a worker thread which hands its progress and result over through
+        # the event queue; the Tk thread polls the queue and is the only one touching widgets
+        self.__worker = None
+        self.__progress = None
+        self.__events = queue.Queue()
+        self.__poll_interval_ms = 100
 
     def run(self):
         self.__init_widgets()
@@ -96,63 +109,140 @@ class GUIModule:
 
         # Buttons
         self.__run_button = tk.Button(self.__root, text = "Run", bg = "#d6d6d4", width = 10, command = self.__run_button_click, state = tk.DISABLED)
-        self.__run_button.grid(row = 0, column = 3, rowspan = 2, padx = 10, pady = 10, sticky = "ns")
+        self.__run_button.grid(row = 0, column = 3, rowspan = 1, padx = 10, pady = 10, sticky = "ns")
+
+        self.__cancel_button = tk.Button(self.__root, text = "Cancel", bg = "#d6d6d4", width = 10, command = self.__cancel_button_click, state = tk.DISABLED)
+        self.__cancel_button.grid(row = 1, column = 3, rowspan = 1, padx = 10, pady = 5, sticky = "ns")
 
         self.__exit_button = tk.Button(self.__root, text = "Exit", bg = "#d41c2b", width = 10, command = self.__exit)
         self.__exit_button.grid(row = 2, column = 3, rowspan = 2, padx = 10, pady = 5, sticky = "ns")
 
-        self.__save_to_json_button = tk.Button(self.__root, text = "Save to json", bg = "#bfbab0", width = 10, command = self.__save_to_json_button_click, state = tk.DISABLED)
-        self.__save_to_json_button.grid(row = 2, column = 1, rowspan = 1, padx = 10, pady = 5, sticky = "ns")
+        self.__save_rules_button = tk.Button(self.__root, text = "Save rules", bg = "#bfbab0", width = 10, command = self.__save_rules_button_click, state = tk.DISABLED)
+        self.__save_rules_button.grid(row = 2, column = 1, rowspan = 1, padx = 10, pady = 5, sticky = "ns")
 
         self.__show_plots_button = tk.Button(self.__root, text = "Show plots", bg = "#bfbab0", width = 10, command = self.__show_plots_button_click, state = tk.DISABLED)
         self.__show_plots_button.grid(row = 3, column = 1, rowspan = 1, padx = 10, pady = 5, sticky = "ns")
 
-        self.__rule_display = tk.Listbox(self.__root)
+        self.__rule_display = RuleTableView(self.__root)
         self.__rule_display.grid(row = 4, column = 0, columnspan = 4, padx = 10, pady = 10, sticky = "nsew")
 
+        self.__progress_label = tk.Label(self.__root, text = "", bg = "#d4d0c7", anchor = "w")
+        self.__progress_label.grid(row = 5, column = 0, columnspan = 4, padx = 10, pady = 5, sticky = "ew")
+
         self.__root.grid_rowconfigure(4, weight = 1)
         self.__root.grid_columnconfigure(0, weight = 1)
 
     def __run_button_click(self):
-        self.__rule_display.delete(0, tk.END)
-        self.__total_records_label.config(text = "")
-        self.__strong_rules_label.config(text = "")
+        if self.__worker != None:
+            return
         try:
             min_sup = float(self.__min_sup_text.get())
             min_conf = float(self.__min_conf_text.get())
-            fixed_length = self.__fixed_length_var.get()
-            omit_first_column = self.__omit_first_column_var.get()
-            self.__adp.set_parameters({"min_sup": min_sup, "min_conf": min_conf})
-            self.__rule_data, total_records = self.__adp.process_data(self.__filepath, fixed_length = fixed_length, ommit_first_column = omit_first_column)
-
-            for rule in self.__rule_data:
-                formatted_rule = self.__format_rule(rule)
-                self.__rule_display.insert(tk.END, formatted_rule)
-                rule["rule"] = f"{rule['rule'][0]} --> {rule['rule'][1]}"
-
-            self.__save_to_json_button.config(state = tk.NORMAL, bg = "#bfbab0")
-            self.__show_plots_button.config(state = tk.NORMAL, bg = "#bfbab0")
-            label = f"{total_records} total records."
-            self.__total_records_label.config(text = label)
-            label = f"{len(self.__rule_data)} strong association rules found."
-            self.__strong_rules_label.config(text = label)
-
         except ValueError:
             print(f"[ERROR] Parameters are incorrect! Please provide floating point values.")
             return
-        
+        fixed_length = self.__fixed_length_var.get()
+        omit_first_column = self.__omit_first_column_var.get()
+
+        self.__rule_display.clear()
+        self.__total_records_label.config(text = "")
+        self.__strong_rules_label.config(text = "")
+        self.__progress_label.config(text = "Mining...")
+        self.__set_running(True)
+
+        self.__adp.set_parameters({"min_sup": min_sup, "min_conf": min_conf, "columnar": True})
+        self.__progress = MiningProgress(lambda event: self.__events.put(("progress", event)))
+        self.__worker = threading.Thread(
+            target = self.__mine,
+            args = (self.__filepath, fixed_length, omit_first_column, self.__progress),
+            daemon = True
+        )
+        self.__worker.start()
+        self.__root.after(self.__poll_interval_ms, self.__poll_events)
+
+    def __mine(self, filepath, fixed_length, omit_first_column, progress):
+        # Runs on the worker thread, so it only talks to the Tk thread through the event queue
+        try:
+            result = self.__adp.process_data(filepath, fixed_length = fixed_length, ommit_first_column = omit_first_column, progress = progress)
+            self.__events.put(("done", result))
+        except Exception as e:
+            self.__events.put(("error", e))
+
+    def __poll_events(self):
+        while True:
+            try:
+                kind, payload = self.__events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self.__progress_label.config(text = self.__format_progress(payload))
+            else:
+                self.__finish_run(kind, payload)
+                return
+        self.__root.after(self.__poll_interval_ms, self.__poll_events)
+
+    def __finish_run(self, kind, payload):
+        cancelled = self.__progress.is_cancelled()
+        self.__worker = None
+        self.__progress = None
+        self.__set_running(False)
+
+        if kind == "error":
+            print(f"[ERROR] Mining failed: {payload}")
+            self.__progress_label.config(text = f"Mining failed: {payload}")
+            return
+        if payload == None:
+            self.__progress_label.config(text = "Mining cancelled." if cancelled else "Mining failed, see the console output.")
+            return
+
+        self.__rules, total_records = payload
+        self.__rule_display.set_rules(self.__rules)
+
+        self.__save_rules_button.config(state = tk.NORMAL, bg = "#bfbab0")
+        self.__show_plots_button.config(state = tk.NORMAL, bg = "#bfbab0")
+        label = f"{total_records} total records."
+        self.__total_records_label.config(text = label)
+        label = f"{len(self.__rules)} strong association rules found."
+        self.__strong_rules_label.config(text = label)
+        self.__progress_label.config(text = "Done.")
+
+    def __cancel_button_click(self):
+        if self.__progress == None:
+            return
+        # The search stops at the next level boundary
+        self.__progress.cancel()
+        self.__cancel_button.config(state = tk.DISABLED, bg = "#d6d6d4")
+        self.__progress_label.config(text = "Cancelling...")
+
+    def __set_running(self, running: bool):
+        idle_state = tk.DISABLED if running else tk.NORMAL
+        self.__run_button.config(state = idle_state, bg = "#d6d6d4" if running else "#54a820")
+        self.__file_button.config(state = idle_state)
+        self.__cancel_button.config(state = tk.NORMAL if running else tk.DISABLED, bg = "#bfbab0" if running else "#d6d6d4")
+        if running:
+            self.__save_rules_button.config(state = tk.DISABLED, bg = "#d6d6d4")
+            self.__show_plots_button.config(state = tk.DISABLED, bg = "#d6d6d4")
+
+    def __format_progress(self, event):
+        counts = ", ".join(f"{key} {value}" for key, value in event.items() if key != "stage")
+        return f"Searching {event['stage']}: {counts}"
+
     def __show_plots_button_click(self):
         self.__adp.show_plots()
 
-    def __save_to_json_button_click(self):
+    def __save_rules_button_click(self):
         file_name = filedialog.asksaveasfilename(
-            defaultextension = ".json",
-            filetypes = [("JSON files", "*.json"), ("All files", "*.*")]
+            defaultextension = ".jsonl",
+            filetypes = [("JSON Lines files", "*.jsonl"), ("JSON files", "*.json"), ("CSV files", "*.csv"), ("Parquet files", "*.parquet"), ("All files", "*.*")]
         )
 
         if file_name:
-            with open(file_name, "w") as file:
-                json.dump(self.__rule_data, file, indent = 4)
+            # Streamed from the columnar rules, the format follows the chosen extension
+            try:
+                self.__adp.export_rules(file_name)
+            except (OSError, ValueError, ImportError) as e:
+                print(f"[ERROR] Could not save rules to file {file_name}: {e}")
+                return
             print(f"Strong association rules saved to file {file_name}")
 
     def __choose_file(self):
@@ -164,7 +254,7 @@ class GUIModule:
         if ext not in self.__supported_datafiles:
             self.__filepath = None
             self.__run_button.config(state = tk.DISABLED, bg = "#d6d6d4")
-            self.__save_to_json_button.config(state = tk.DISABLED, bg = "#d6d6d4")
+            self.__save_rules_button.config(state = tk.DISABLED, bg = "#d6d6d4")
             self.__show_plots_button_click.config(state = tk.DISABLED, bg = "#d6d6d4")
             self.__fixed_length_checkbox.config(state = tk.DISABLED)
             self.__omit_column_checkbox.config(state = tk.DISABLED)
@@ -193,15 +283,7 @@ class GUIModule:
         self.__file_name_entry.config(state = tk.DISABLED)
 
     def __exit(self):
-        self.__root.destroy()
-
-    def __format_rule(self, rule_data):
-        return f"Rule: {rule_data['rule']}, " + \
-               f"Support: {rule_data['sup']:.4g}, " + \
-               f"rSUP: {rule_data['rsup']:.4g}, " + \
-               f"Confidence: {rule_data['conf']:.4g}, " + \
-               f"Lift: {rule_data['lift']:.4g}, " + \
-               f"Cosine: {rule_data['cosine']:.4g}, " + \
-               f"Jaccard: {rule_data['jaccard']:.4g}, " + \
-               f"Certainty Factor: {rule_data['cf']:.4g}"
-    
\ No newline at end of file
+        # A running search is told to stop; the daemon worker thread does not keep the process alive
+        if self.__progress != None:
+            self.__progress.cancel()
+        self.__root.destroy()
\ No newline at end of file
@@ -0,0 +1,191 @@
+import tkinter as tk
+from tkinter import font, ttk
+import numpy as np
+
+from data_processing.rule_table import METRIC_COLUMNS, RuleTable
+
+# Column id -> (heading, width)
+COLUMNS = {
+    "antecedent": ("Antecedent", 260),
+    "consequent": ("Consequent", 200),
+    "sup": ("Support", 70),
+    "rsup": ("rSUP", 70),
+    "conf": ("Confidence", 80),
+    "lift": ("Lift", 70),
+    "cosine": ("Cosine", 70),
+    "jaccard": ("Jaccard", 70),
+    "cf": ("Certainty Factor", 100)
+}
+
+class RuleTableView:
+    def __init__(self, parent):
+        # Only the rows that fit into the widget are ever inserted into the Treeview. The view
+        # itself is an array of rule positions into the RuleTable, so sorting and filtering are
+        # numpy operations over the metric arrays and nothing is formatted until it is visible.
+        self.__rules = RuleTable()
+        self.__view = np.zeros(0, dtype = np.int64)
+        self.__first_row = 0
+        self.__page_size = 1
+        self.__row_height = 20
+
+        self.__sort_column = None
+        self.__sort_descending = True
+
+        self.frame = tk.Frame(parent, bg = "#d4d0c7")
+        self.__item_filter_text = tk.StringVar(value = "")
+        self.__metric_filter_column = tk.StringVar(value = "lift")
+        self.__metric_filter_text = tk.StringVar(value = "")
+        self.__status_label = None
+        self.__tree = None
+        self.__scrollbar = None
+
+        self.__init_widgets()
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def set_rules(self, rules: RuleTable):
+        self.__rules = rules
+        self.__sort_column = None
+        self.__sort_descending = True
+        self.__update_headings()
+        self.__apply_filter()
+
+    def clear(self):
+        self.set_rules(RuleTable())
+
+    def __init_widgets(self):
+        # Filter bar
+        tk.Label(self.frame, text = "Item contains:", bg = "#d4d0c7").grid(row = 0, column = 0, padx = 5, pady = 5, sticky = "w")
+        item_filter_entry = tk.Entry(self.frame, textvariable = self.__item_filter_text)
+        item_filter_entry.grid(row = 0, column = 1, padx = 5, pady = 5, sticky = "ew")
+        item_filter_entry.bind("<Return>", lambda event: self.__apply_filter())
+
+        metric_filter_menu = ttk.Combobox(self.frame, textvariable = self.__metric_filter_column, values = METRIC_COLUMNS, state = "readonly", width = 8)
+        metric_filter_menu.grid(row = 0, column = 2, padx = 5, pady = 5)
+        tk.Label(self.frame, text = ">=", bg = "#d4d0c7").grid(row = 0, column = 3, pady = 5)
+        metric_filter_entry = tk.Entry(self.frame, textvariable = self.__metric_filter_text, width = 10)
+        metric_filter_entry.grid(row = 0, column = 4, padx = 5, pady = 5)
+        metric_filter_entry.bind("<Return>", lambda event: self.__apply_filter())
+
+        filter_button = tk.Button(self.frame, text = "Filter", bg = "#bfbab0", width = 10, command = self.__apply_filter)
+        filter_button.grid(row = 0, column = 5, padx = 5, pady = 5)
+        self.__status_label = tk.Label(self.frame, text = "", bg = "#d4d0c7")
+        self.__status_label.grid(row = 0, column = 6, padx = 5, pady = 5, sticky = "e")
+
+        # Fixed row height, so the number of visible rows follows from the widget height
+        row_height = font.nametofont("TkDefaultFont").metrics("linespace") + 4
+        ttk.Style().configure("Rules.Treeview", rowheight = row_height)
+        self.__row_height = row_height
+
+        self.__tree = ttk.Treeview(self.frame, columns = list(COLUMNS), show = "headings", style = "Rules.Treeview", selectmode = "browse")
+        for column, (heading, width) in COLUMNS.items():
+            self.__tree.column(column, width = width, anchor = "w" if column in {"antecedent", "consequent"} else "e")
+        self.__update_headings()
+        self.__tree.grid(row = 1, column = 0, columnspan = 7, sticky = "nsew")
+
+        self.__scrollbar = ttk.Scrollbar(self.frame, orient = tk.VERTICAL, command = self.__on_scrollbar)
+        self.__scrollbar.grid(row = 1, column = 7, sticky = "ns")
+
+        self.__tree.bind("<Configure>", self.__on_resize)
+        self.__tree.bind("<MouseWheel>", lambda event: self.__scroll_to(self.__first_row - 3 * int(np.sign(event.delta))))
+        self.__tree.bind("<Button-4>", lambda event: self.__scroll_to(self.__first_row - 3))
+        self.__tree.bind("<Button-5>", lambda event: self.__scroll_to(self.__first_row + 3))
+        self.__tree.bind("<Prior>", lambda event: self.__scroll_to(self.__first_row - self.__page_size))
+        self.__tree.bind("<Next>", lambda event: self.__scroll_to(self.__first_row + self.__page_size))
+
+        self.frame.grid_rowconfigure(1, weight = 1)
+        self.frame.grid_columnconfigure(1, weight = 1)
+
+    def __update_headings(self):
+        for column, (heading, width) in COLUMNS.items():
+            if column in METRIC_COLUMNS:
+                if column == self.__sort_column:
+                    heading += " ▼" if self.__sort_descending else " ▲"
+                self.__tree.heading(column, text = heading, command = lambda column = column: self.__sort_by(column))
+            else:
+                self.__tree.heading(column, text = heading)
+
+    def __sort_by(self, column: str):
+        # Clicking the sorted column again flips the direction
+        if column == self.__sort_column:
+            self.__sort_descending = not self.__sort_descending
+        else:
+            self.__sort_column = column
+            self.__sort_descending = True
+        self.__update_headings()
+        self.__sort_view()
+        self.__scroll_to(0)
+
+    def __sort_view(self):
+        if self.__sort_column == None:
+            return
+        values = self.__rules.metrics[self.__sort_column][self.__view]
+        order = np.argsort(-values if self.__sort_descending else values, kind = "stable")
+        self.__view = self.__view[order]
+
+    def __apply_filter(self):
+        mask = np.ones(len(self.__rules), dtype = bool)
+
+        # Items are matched by name once, the rules by item id
+        item_filter = self.__item_filter_text.get().strip().lower()
+        if item_filter != "":
+            item_ids = [i for i, name in enumerate(self.__rules.item_names) if item_filter in str(name).lower()]
+            mask &= self.__rules.items_mask(item_ids)
+
+        metric_filter = self.__metric_filter_text.get().strip()
+        if metric_filter != "":
+            try:
+                threshold = float(metric_filter)
+            except ValueError:
+                print("[ERROR] Filter threshold has to be a number.")
+                return
+            mask &= self.__rules.metrics[self.__metric_filter_column.get()] >= threshold
+
+        self.__view = np.flatnonzero(mask)
+        self.__sort_view()
+        self.__scroll_to(0)
+
+    def __on_resize(self, event):
+        # The heading row takes roughly one row of the height
+        page_size = max(1, event.height // self.__row_height - 1)
+        if page_size != self.__page_size:
+            self.__page_size = page_size
+            self.__scroll_to(self.__first_row)
+
+    def __on_scrollbar(self, action, value, unit = None):
+        if action == "moveto":
+            self.__scroll_to(int(float(value) * len(self.__view)))
+        elif action == "scroll":
+            step = self.__page_size if unit == "pages" else 1
+            self.__scroll_to(self.__first_row + int(value) * step)
+
+    def __scroll_to(self, first_row: int):
+        self.__first_row = max(0, min(first_row, len(self.__view) - self.__page_size))
+        self.__refresh()
+
+    def __refresh(self):
+        self.__tree.delete(*self.__tree.get_children())
+        last_row = min(self.__first_row + self.__page_size, len(self.__view))
+        for position in self.__view[self.__first_row:last_row].tolist():
+            self.__tree.insert("", tk.END, values = self.__format_row(position))
+
+        if len(self.__view) == 0:
+            self.__scrollbar.set(0.0, 1.0)
+        else:
+            self.__scrollbar.set(self.__first_row / len(self.__view), last_row / len(self.__view))
+        self.__status_label.config(text = f"Showing {len(self.__view)} of {len(self.__rules)} rules.")
+
+    def __format_row(self, i: int) -> tuple:
+        metrics = self.__rules.metrics
+        return (
+            ", ".join(sorted(str(item) for item in self.__rules.antecedent(i))),
+            ", ".join(sorted(str(item) for item in self.__rules.consequent(i))),
+            f"{metrics['sup'][i]}",
+            f"{metrics['rsup'][i]:.4g}",
+            f"{metrics['conf'][i]:.4g}",
+            f"{metrics['lift'][i]:.4g}",
+            f"{metrics['cosine'][i]:.4g}",
+            f"{metrics['jaccard'][i]:.4g}",
+            f"{metrics['cf'][i]:.4g}"
+        )
\ No newline at end of file